@@ -1,62 +1,62 @@
-import time
+import sys
 import pandas as pd
-from pytrends.request import TrendReq
-import matplotlib.pyplot as plt
-import random
+from concurrent.futures import ThreadPoolExecutor
+from trends_client import fetch_interest_over_time, get_client
 
 # Core Directives: Safety & Data-Driven
 # 1. Niches identified from Market Research
 NICHES = ["Eco Friendly", "Smart Pet", "Sleep Technology"]
+MAX_WORKERS = 3
 
-def fetch_trends():
-    # Initialize Pytrends
-    # Removed retries/backoff_factor due to urllib3 'method_whitelist' compatibility issue
-    pytrends = TrendReq(hl='en-US', tz=360)
+def fetch_niche(niche):
+    print(f"[*] Fetching data for: {niche}")
+    try:
+        # Each worker thread uses its own pytrends client (pooled session with
+        # transport retries configured in trends_client)
+        pytrends = get_client(hl='en-US', tz=360)
+        
+        # Build payload for single keyword to see individual shape
+        # Timeframe: Past 12 months to see recent steady growth
+        data, from_cache = fetch_interest_over_time(pytrends, [niche], timeframe='today 12-m')
+    except Exception as e:
+        print(f"[!] Error fetching {niche}: {e}")
+        return None
+    
+    # SAFETY: throttling (429/5xx) is handled with exponential backoff in
+    # trends_client, so no blind sleep between healthy requests
+    if from_cache:
+        print(f"[*] Cache hit for {niche}, no request made")
     
-    all_data = pd.DataFrame()
+    if data.empty:
+        print(f"[!] No data found for {niche}")
+        return None
+    
+    # Remove partial data indicator
+    if 'isPartial' in data.columns:
+        data = data.drop(columns=['isPartial'])
+    return data
 
+def fetch_trends():
     print("Starting Trend Hunting...")
     
-    for niche in NICHES:
-        print(f"[*] Fetching data for: {niche}")
-        try:
-            # Build payload for single keyword to see individual shape
-            # Timeframe: Past 12 months to see recent steady growth
-            pytrends.build_payload([niche], cat=0, timeframe='today 12-m')
-            
-            # Get interest over time
-            data = pytrends.interest_over_time()
-            
-            if not data.empty:
-                # Remove partial data indicator
-                if 'isPartial' in data.columns:
-                    data = data.drop(columns=['isPartial'])
-                
-                # Merge into main dataframe
-                if all_data.empty:
-                    all_data = data
-                else:
-                    all_data = all_data.join(data)
-            else:
-                print(f"[!] No data found for {niche}")
+    # Fetch niches concurrently; trends_client caps in-flight requests
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        frames = [data for data in executor.map(fetch_niche, NICHES) if data is not None]
 
-        except Exception as e:
-            print(f"[!] Error fetching {niche}: {e}")
-        
-        # SAFETY: The "Human Pace" Rule
-        # Sleep 10 seconds between requests to avoid 429
-        sleep_time = 10 + random.uniform(1, 3) # Add a little jitter
-        print(f"Sleeping for {sleep_time:.2f} seconds...")
-        time.sleep(sleep_time)
-
-    return all_data
+    # Merge into main dataframe in one go (joining inside the loop is quadratic)
+    return pd.concat(frames, axis=1) if frames else pd.DataFrame()
 
 def plot_trends(data):
     if data.empty:
         print("No data to plot.")
         return
 
-    plt.figure(figsize=(10, 6))
+    # Imported lazily: pyplot is slow to load and only needed here
+    import matplotlib
+    matplotlib.use('Agg')  # Non-GUI backend: the graph is only saved to disk
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(10, 6), constrained_layout=True)
     
     for column in data.columns:
         plt.plot(data.index, data[column], label=column, linewidth=2)
@@ -68,17 +68,22 @@ def plot_trends(data):
     plt.grid(True, alpha=0.3)
     
     # Analyze steady growth logic (simple variance/slope check visual)
-    plt.tight_layout()
-    
     output_file = 'trends_graph.png'
-    plt.savefig(output_file)
+    fig.savefig(output_file)
+    plt.close(fig)
     print(f"Graph saved to {output_file}")
 
 if __name__ == "__main__":
     trends_data = fetch_trends()
     
     # Save raw data as per "One File Truth" rule
-    trends_data.to_csv("trends_data.csv")
-    print("Data saved to trends_data.csv")
+    # Parquet is binary/columnar: faster to write and read back than CSV
+    trends_data.to_parquet("trends_data.parquet", compression="zstd", engine="pyarrow")
+    print("Data saved to trends_data.parquet")
+    
+    # Optional human-readable copy
+    if '--csv' in sys.argv:
+        trends_data.to_csv("trends_data.csv")
+        print("Data saved to trends_data.csv")
     
     plot_trends(trends_data)
@@ -7,23 +7,103 @@ It calculates volatility vs growth ratios and identifies "Green Light" niches
 with steady growth without significant dips.
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
 from pytrends.request import TrendReq
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
 from typing import Dict, List, Tuple
 import warnings
+from trends_client import fetch_interest_over_time, get_client
 warnings.filterwarnings('ignore')
 
+# Optional: numba compiles a parallel metrics kernel for large keyword sets
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Below this many data points (keywords x time) the JIT setup cost dominates
+JIT_MIN_SIZE = 10_000
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _metrics_kernel(matrix, window):
+        """Compiled equivalent of NichesAnalyzer.calculate_metrics (needs >= 3 points)."""
+        n_keywords, n_points = matrix.shape
+        n = min(3, n_points)
+        n_rolling = n_points - window + 1
+        growth = np.empty(n_keywords)
+        volatility = np.empty(n_keywords)
+        stability = np.empty(n_keywords)
+        
+        for k in prange(n_keywords):
+            row = matrix[k]
+            
+            # Growth
+            start_avg = row[:n].mean()
+            end_avg = row[n_points - n:].mean()
+            if start_avg == 0:
+                growth[k] = 0.0 if end_avg == 0 else 100.0
+            else:
+                growth[k] = (end_avg - start_avg) / start_avg * 100
+            
+            # Volatility
+            mean_val = row.mean()
+            if mean_val == 0:
+                volatility[k] = 0.0
+            else:
+                sq_sum = 0.0
+                for t in range(n_points):
+                    diff = row[t] - mean_val
+                    sq_sum += diff * diff
+                volatility[k] = np.sqrt(sq_sum / n_points) / mean_val * 100
+            
+            # Stability: running-sum rolling average and dip count
+            window_sum = row[:window].sum()
+            prev = window_sum / window
+            dips = 0
+            for t in range(1, n_rolling):
+                window_sum += row[t + window - 1] - row[t - 1]
+                curr = window_sum / window
+                if curr < prev * 0.7:
+                    dips += 1
+                prev = curr
+            stability[k] = min(1.0, max(0.0, 1.0 - dips / n_rolling))
+        
+        return growth, volatility, stability
+
+
+def _pyplot():
+    """Import pyplot on first use; it is slow to load and only needed for graphs."""
+    import matplotlib
+    matplotlib.use('Agg')  # Non-GUI backend: figures are only saved to disk
+    import matplotlib.pyplot as plt
+    return plt
+
 
 class NichesAnalyzer:
     """Analyzes dropshipping niches using Google Trends data."""
     
-    def __init__(self, hl='en-US', tz=360):
+    def __init__(self, hl='en-US', tz=360, max_workers=3):
         """Initialize the analyzer with pytrends."""
-        self.pytrends = TrendReq(hl=hl, tz=tz)
+        self.hl = hl
+        self.tz = tz
+        self.max_workers = max_workers  # Niches fetched concurrently
         self.results = {}
+        # Keyword batch -> {keyword: values} and timestamps, so a batch asked for
+        # again is only fetched once per run. Keyed on the whole batch, since
+        # Google Trends scales values relative to the other keywords in it.
+        # Niche threads share it, hence the lock.
+        self._batch_cache: Dict[Tuple[str, ...], Tuple[Dict[str, np.ndarray], object]] = {}
+        self._batch_cache_lock = threading.Lock()
+    
+    @property
+    def pytrends(self) -> TrendReq:
+        """The calling thread's pytrends client."""
+        return get_client(self.hl, self.tz)
         
     def get_trending_niches(self) -> Dict[str, List[str]]:
         """
@@ -99,17 +179,17 @@ class NichesAnalyzer:
             if len(keywords) > 5:
                 keywords = keywords[:5]  # Limit to 5 keywords per request
                 
-            self.pytrends.build_payload(
+            # Get interest over time (served from the on-disk cache when fresh;
+            # throttled requests are retried with backoff by trends_client)
+            data, _ = fetch_interest_over_time(
+                self.pytrends,
                 keywords,
-                cat=0,
                 timeframe=timeframe,
                 geo='',
-                gprop=''
+                gprop='',
+                cat=0
             )
             
-            # Get interest over time
-            data = self.pytrends.interest_over_time()
-            
             if data.empty:
                 return None
             
@@ -117,9 +197,6 @@ class NichesAnalyzer:
             if 'isPartial' in data.columns:
                 data = data.drop(columns=['isPartial'])
             
-            # Rate limiting to avoid being blocked
-            time.sleep(1)
-            
             return data
             
         except Exception as e:
@@ -155,7 +232,8 @@ class NichesAnalyzer:
         if mean_val == 0:
             return 0.0
         
-        std_val = np.std(values)
+        # Reuse the mean rather than letting np.std compute it again
+        std_val = np.sqrt(np.mean((values - mean_val) ** 2))
         return (std_val / mean_val) * 100  # Coefficient of variation as percentage
     
     def calculate_trend_stability(self, values: np.ndarray) -> float:
@@ -174,54 +252,94 @@ class NichesAnalyzer:
         rolling_avg = np.convolve(values, np.ones(window)/window, mode='valid')
         
         # Check for dips (values that drop significantly below recent average)
-        dips = 0
-        for i in range(1, len(rolling_avg)):
-            if rolling_avg[i] < rolling_avg[i-1] * 0.7:  # 30% drop
-                dips += 1
+        prev, curr = rolling_avg[:-1], rolling_avg[1:]
+        dips = np.count_nonzero(curr < prev * 0.7)  # 30% drop
         
         # Stability score: fewer dips = higher score
         stability = 1.0 - (dips / len(rolling_avg))
         return max(0.0, min(1.0, stability))
     
+    def calculate_metrics(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized growth, volatility and stability for a (keywords, time) matrix.
+        Each row gives the same result as the per-series calculate_* methods.
+        """
+        n_keywords, n_points = matrix.shape
+        
+        # Large batches go through the compiled kernel when numba is installed
+        if NUMBA_AVAILABLE and matrix.size > JIT_MIN_SIZE and n_points >= 3:
+            window = max(1, min(3, n_points // 4))
+            return _metrics_kernel(np.ascontiguousarray(matrix, dtype=np.float64), window)
+        
+        # Growth: average of first 3 values vs last 3 values
+        if n_points < 2:
+            growth = np.zeros(n_keywords)
+        else:
+            n = min(3, n_points)
+            start_avg = matrix[:, :n].mean(axis=1)
+            end_avg = matrix[:, -n:].mean(axis=1)
+            safe_start = np.where(start_avg == 0, 1, start_avg)
+            growth = np.where(start_avg == 0,
+                              np.where(end_avg == 0, 0.0, 100.0),
+                              (end_avg - start_avg) / safe_start * 100)
+        
+        # Volatility: coefficient of variation as percentage
+        if n_points < 2:
+            volatility = np.zeros(n_keywords)
+        else:
+            mean_val = matrix.mean(axis=1)
+            std_val = np.sqrt(np.mean((matrix - mean_val[:, None]) ** 2, axis=1))
+            safe_mean = np.where(mean_val == 0, 1, mean_val)
+            volatility = np.where(mean_val == 0, 0.0, std_val / safe_mean * 100)
+        
+        # Stability: share of rolling-average steps without a 30% drop
+        if n_points < 3:
+            stability = np.full(n_keywords, 0.5)
+        else:
+            window = max(1, min(3, n_points // 4))
+            cumsum = np.cumsum(np.pad(matrix, ((0, 0), (1, 0))), axis=1)
+            rolling_avg = (cumsum[:, window:] - cumsum[:, :-window]) / window
+            dips = np.count_nonzero(rolling_avg[:, 1:] < rolling_avg[:, :-1] * 0.7, axis=1)
+            stability = np.clip(1.0 - dips / rolling_avg.shape[1], 0.0, 1.0)
+        
+        return growth, volatility, stability
+    
     def analyze_niche(self, niche_name: str, keywords: List[str]) -> Dict:
         """
         Analyze a single niche by fetching data and calculating metrics.
         """
         print(f"Analyzing niche: {niche_name}...")
         
-        # Fetch data for all keywords in this niche
-        all_data = {}
-        timestamps = None
-        
-        for keyword in keywords:
-            data_df = self.fetch_trends_data([keyword])
-            if data_df is not None and not data_df.empty and keyword in data_df.columns:
-                all_data[keyword] = data_df[keyword].values
-                if timestamps is None:
-                    timestamps = data_df.index
-            time.sleep(1)  # Rate limiting
+        # Fetch data for all keywords in this niche with a single request.
+        # Google Trends scales values relative to the batch, which is what we
+        # want when comparing keywords within a niche. A batch already fetched
+        # for another niche is reused from the memo; a keyword is never mixed
+        # in from a different batch, whose 0-100 scale would not match.
+        batch = tuple(keywords[:5])
+        
+        with self._batch_cache_lock:
+            cached = self._batch_cache.get(batch)
+        if cached is None:
+            data_df = self.fetch_trends_data(list(batch))
+            if data_df is None or data_df.empty:
+                return None
+            cached = ({keyword: data_df[keyword].values for keyword in batch if keyword in data_df.columns},
+                      data_df.index)
+            with self._batch_cache_lock:
+                self._batch_cache[batch] = cached
+        all_data, timestamps = dict(cached[0]), cached[1]
         
         if not all_data:
             return None
         
-        # Aggregate metrics across all keywords in the niche
-        growth_scores = []
-        volatility_scores = []
-        stability_scores = []
-        
-        for keyword, values in all_data.items():
-            growth = self.calculate_growth(values)
-            volatility = self.calculate_volatility(values)
-            stability = self.calculate_trend_stability(values)
-            
-            growth_scores.append(growth)
-            volatility_scores.append(volatility)
-            stability_scores.append(stability)
+        # Compute metrics for all keywords in the niche at once
+        matrix = np.stack(list(all_data.values())).astype(float)
+        growth_scores, volatility_scores, stability_scores = self.calculate_metrics(matrix)
         
         # Average metrics across keywords
-        avg_growth = np.mean(growth_scores) if growth_scores else 0
-        avg_volatility = np.mean(volatility_scores) if volatility_scores else 0
-        avg_stability = np.mean(stability_scores) if stability_scores else 0
+        avg_growth = np.mean(growth_scores)
+        avg_volatility = np.mean(volatility_scores)
+        avg_stability = np.mean(stability_scores)
         
         # Calculate volatility vs growth ratio
         # Lower ratio = better (less volatility relative to growth)
@@ -246,11 +364,17 @@ class NichesAnalyzer:
         niches = self.get_trending_niches()
         results = {}
         
-        for niche_name, keywords in niches.items():
-            result = self.analyze_niche(niche_name, keywords)
-            if result:
-                results[niche_name] = result
-            time.sleep(2)  # Rate limiting between niches
+        # Niches are independent, so fetch them in parallel; the request cap
+        # and backoff in trends_client keep us under Google's rate limit
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                niche_name: executor.submit(self.analyze_niche, niche_name, keywords)
+                for niche_name, keywords in niches.items()
+            }
+            for niche_name, future in futures.items():
+                result = future.result()
+                if result:
+                    results[niche_name] = result
         
         self.results = results
         return results
@@ -295,12 +419,14 @@ class NichesAnalyzer:
             print("No results to plot. Run analyze_all_niches() first.")
             return
         
+        plt = _pyplot()
+        
         # Create figure with subplots
         n_niches = len(self.results)
         cols = 2
         rows = (n_niches + 1) // 2
         
-        fig, axes = plt.subplots(rows, cols, figsize=(16, 4 * rows))
+        fig, axes = plt.subplots(rows, cols, figsize=(16, 4 * rows), constrained_layout=True)
         if n_niches == 1:
             axes = [axes]
         else:
@@ -339,10 +465,9 @@ class NichesAnalyzer:
         for idx in range(n_niches, len(axes)):
             axes[idx].set_visible(False)
         
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.close(fig)
         print(f"\nGraph saved to: {save_path}")
-        plt.show()
     
     def plot_combined_trajectory(self, save_path: str = 'combined_trajectories.png'):
         """Plot all niches on a single graph for comparison."""
@@ -350,7 +475,9 @@ class NichesAnalyzer:
             print("No results to plot. Run analyze_all_niches() first.")
             return
         
-        plt.figure(figsize=(16, 8))
+        plt = _pyplot()
+        
+        fig = plt.figure(figsize=(16, 8), constrained_layout=True)
         
         # Plot average trend for each niche
         for niche_name, result in self.results.items():
@@ -381,10 +508,9 @@ class NichesAnalyzer:
         plt.legend(loc='best', fontsize=10, framealpha=0.9)
         plt.grid(True, alpha=0.3)
         plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.close(fig)
         print(f"\nCombined graph saved to: {save_path}")
-        plt.show()
 
 
 def main():
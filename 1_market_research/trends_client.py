@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Google Trends Client
+Shared pytrends helpers for the market research scripts.
+
+Results of interest_over_time() are cached on disk for a day, so re-running
+an analysis (re-plotting, tuning thresholds) does not hit Google again.
+Rate-limit responses (429/5xx) are retried with exponential backoff instead
+of sleeping a fixed amount before every request. Requests may be issued from
+several threads; a shared semaphore caps how many hit Google at once. Each
+client keeps one pooled keep-alive HTTP session, so TLS handshakes are not
+repeated for every request.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import random
+import threading
+import time
+from datetime import date
+from typing import List, Tuple
+
+import pandas as pd
+import requests
+from pytrends import exceptions
+from pytrends.exceptions import ResponseError
+from pytrends.request import TrendReq
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CACHE_DIR = '.pytrends_cache'
+CACHE_EXPIRE = 86400  # Seconds a cached response stays valid
+
+# Backoff for throttled requests: 1s, 2s, 4s, ... capped at 60s, plus jitter
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+MAX_ATTEMPTS = 5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Concurrent requests allowed against Google Trends across all threads
+MAX_CONCURRENT_REQUESTS = 3
+
+# Transport-level retries for dropped connections and read timeouts only.
+# Status codes (429 and 5xx) are left to the backoff loop below, so the two
+# retry layers never compound on the same error response.
+TRANSPORT_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=3,
+    status=0,
+    backoff_factor=1,
+    allowed_methods=['GET', 'POST'],
+    raise_on_status=False,
+)
+
+_MISS = object()
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+_local = threading.local()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=TRANSPORT_RETRY)
+    session.mount('https://', adapter)
+    return session
+
+
+class PooledTrendReq(TrendReq):
+    """TrendReq that reuses one keep-alive session instead of opening one per request."""
+    
+    def __init__(self, *args, **kwargs):
+        self.session = _build_session()
+        super().__init__(*args, **kwargs)
+    
+    def _get_data(self, url, method=TrendReq.GET_METHOD, trim_chars=0, **kwargs):
+        """Same contract as TrendReq._get_data, but sent over the pooled session."""
+        s = self.session
+        s.headers.update(self.headers)
+        if len(self.proxies) > 0:
+            self.cookies = self.GetGoogleCookie()
+            s.proxies.update({'https': self.proxies[self.proxy_index]})
+        if method == TrendReq.POST_METHOD:
+            response = s.post(url, timeout=self.timeout, cookies=self.cookies,
+                              **kwargs, **self.requests_args)
+        else:
+            response = s.get(url, timeout=self.timeout, cookies=self.cookies,
+                             **kwargs, **self.requests_args)
+        
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code == 200 and any(
+                t in content_type for t in ('application/json', 'application/javascript', 'text/javascript')):
+            # Some responses start with garbage characters, like ")]}',"
+            self.GetNewProxy()
+            return json.loads(response.text[trim_chars:])
+        if response.status_code == 429:
+            raise exceptions.TooManyRequestsError.from_response(response)
+        raise exceptions.ResponseError.from_response(response)
+
+
+def get_client(hl: str = 'en-US', tz: int = 360) -> TrendReq:
+    """
+    Return this thread's TrendReq client.
+    TrendReq keeps per-request state (payload, tokens), so one client must not
+    be shared between threads; each worker thread reuses its own instead.
+    """
+    clients = getattr(_local, 'clients', None)
+    if clients is None:
+        clients = _local.clients = {}
+    if (hl, tz) not in clients:
+        clients[(hl, tz)] = PooledTrendReq(hl=hl, tz=tz)
+    return clients[(hl, tz)]
+
+
+def _cache_key(keywords: List[str], timeframe: str, geo: str, gprop: str, cat: int) -> str:
+    """Build a stable cache key; the date bucket makes entries roll over daily."""
+    raw = repr((tuple(keywords), timeframe, geo, gprop, cat, date.today().isoformat()))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+
+def cache_get(key: str, default=_MISS):
+    """Return the cached value for key, or default if missing or expired."""
+    path = _cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_EXPIRE:
+            return default
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return default
+
+
+def cache_set(key: str, value) -> None:
+    """Store value under key (written atomically so readers never see partial files)."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(key)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Exponential backoff delay for the given (0-based) retry attempt."""
+    return min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)) + random.uniform(0, BACKOFF_BASE)
+
+
+def _is_retryable(error: ResponseError) -> bool:
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in RETRY_STATUS_CODES
+
+
+def _request_with_backoff(pytrends, keywords: List[str], timeframe: str,
+                          geo: str, gprop: str, cat: int) -> pd.DataFrame:
+    """Issue the request, sleeping only when Google signals throttling."""
+    # Hold the slot through backoff so throttled threads don't free room for more load
+    with _request_slots:
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                pytrends.build_payload(keywords, cat=cat, timeframe=timeframe, geo=geo, gprop=gprop)
+                return pytrends.interest_over_time()
+            except ResponseError as e:
+                if not _is_retryable(e) or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                delay = get_backoff_delay(attempt)
+                print(f"[!] Google Trends returned {e.response.status_code}, "
+                      f"retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_ATTEMPTS - 1})")
+                time.sleep(delay)
+
+
+def fetch_interest_over_time(pytrends, keywords: List[str], timeframe: str = 'today 12-m',
+                             geo: str = '', gprop: str = '', cat: int = 0) -> Tuple[pd.DataFrame, bool]:
+    """
+    Fetch interest over time for up to 5 keywords, using the on-disk cache.
+    Returns (data, from_cache) so callers can skip rate-limit sleeps on cache hits.
+    """
+    key = _cache_key(keywords, timeframe, geo, gprop, cat)
+    cached = cache_get(key)
+    if cached is not _MISS:
+        return cached, True
+
+    data = _request_with_backoff(pytrends, keywords, timeframe, geo, gprop, cat)
+
+    # Only cache real answers; an empty frame is usually a transient block
+    if not data.empty:
+        cache_set(key, data)
+    return data, False
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Browser Pool
+Shared Playwright browser, contexts and page helpers for the sourcing scrapers.
+"""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, Route, async_playwright
+
+# The scrapers only read text and hrefs, so these are never worth downloading
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+# Analytics and ad beacons; scripts otherwise load, since the result lists
+# are rendered client-side
+BLOCKED_HOST_SUFFIXES = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'mmstat.com',
+)
+
+# Signs that a site served a bot check instead of the page asked for; shared by
+# the plain-HTTP fetches, which can't rely on the browser to show it
+BLOCKED_STATUS_CODES = (403, 429, 503)
+ANTI_BOT_MARKERS = ('_____tmd_____', 'x5secdata', '/punish?', 'slide to verify', 'validateCaptcha')
+
+
+def aliexpress_search_url(keyword: str) -> str:
+    return f"https://www.aliexpress.com/wholesale?SearchText={keyword.replace(' ', '+')}"
+
+
+# Scroll to the bottom until `target` cards matching `selector` are present or the
+# count stops growing; one evaluate() instead of a scroll + fixed sleep per round.
+SCROLL_UNTIL_JS = """
+async ([selector, target, rounds, pauseMs]) => {
+    let prev = -1;
+    for (let i = 0; i < rounds; i++) {
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, pauseMs));
+        const n = document.querySelectorAll(selector).length;
+        if (n >= target || n === prev) return n;
+        prev = n;
+    }
+    return prev;
+}
+"""
+
+# Pop-up dismiss buttons, most specific first; matching every <button> on the
+# page (hundreds on Amazon) and clicking blindly wasted seconds per load
+POPUP_CLOSE_SELECTORS = (
+    'button[aria-label="Close"]',
+    '[class*="close-btn"]',
+    'button:has-text("Accept")',
+)
+
+# Contexts whose pop-ups (cookie banners etc.) were already dismissed; the choice
+# sticks in the context's cookies, so later pages don't need the scan
+_popups_closed = weakref.WeakSet()
+
+
+async def scroll_until(page: Page, selector: str, target: int, rounds: int = 6, pause_ms: int = 500) -> int:
+    """Scroll to load lazy results; returns how many `selector` matches are on the page."""
+    return await page.evaluate(SCROLL_UNTIL_JS, [selector, target, rounds, pause_ms])
+
+
+async def close_popups_once(page: Page):
+    """Dismiss the first visible pop-up (close button or cookie banner), once per browser context."""
+    if page.context in _popups_closed:
+        return
+    _popups_closed.add(page.context)
+    close_locator = page.locator(POPUP_CLOSE_SELECTORS[0])
+    for selector in POPUP_CLOSE_SELECTORS[1:]:
+        close_locator = close_locator.or_(page.locator(selector))
+    try:
+        await close_locator.first.click(timeout=1500)
+    except:
+        pass
+
+
+def _is_blocked_host(url: str) -> bool:
+    host = urlsplit(url).hostname or ''
+    return any(host == suffix or host.endswith('.' + suffix) for suffix in BLOCKED_HOST_SUFFIXES)
+
+
+async def block_heavy_resources(route: Route):
+    """Route handler: abort heavy resources and tracking beacons, let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Process-wide warm browser shared by consecutive jobs (see get_or_create_browser)
+_shared_playwright = None
+_shared_browser: Optional[Browser] = None
+_shared_browser_lock: Optional[asyncio.Lock] = None
+
+
+async def get_or_create_browser(headless: bool = True, launch_args: Optional[List[str]] = None) -> Browser:
+    """
+    Return the shared browser, launching it on first use or after it crashed.
+    Concurrent callers wait on one launch instead of each starting Chromium.
+    """
+    global _shared_playwright, _shared_browser, _shared_browser_lock
+    if _shared_browser_lock is None:
+        _shared_browser_lock = asyncio.Lock()
+    async with _shared_browser_lock:
+        if _shared_browser is None or not _shared_browser.is_connected():
+            if _shared_playwright is None:
+                _shared_playwright = await async_playwright().start()
+            _shared_browser = await _shared_playwright.chromium.launch(headless=headless, args=launch_args or [])
+        return _shared_browser
+
+
+async def drain_browser_pool():
+    """Close the shared browser and stop Playwright; call once all jobs are done."""
+    global _shared_playwright, _shared_browser
+    if _shared_browser is not None:
+        try:
+            await _shared_browser.close()
+        except Exception:
+            pass
+    if _shared_playwright is not None:
+        await _shared_playwright.stop()
+    _shared_playwright = None
+    _shared_browser = None
+
+
+class AsyncRateLimiter:
+    """
+    At most `max_per_window` tasks per `window` seconds, counted from when each
+    task *finishes*: `async with limiter:` takes a slot, and the slot only frees
+    up `window` seconds after the block exits. Slow requests therefore slow the
+    pace down too, instead of independent timers firing into a struggling site.
+    """
+
+    def __init__(self, max_per_window: int, window: float):
+        self.window = window
+        self._slots = asyncio.Semaphore(max_per_window)
+
+    async def __aenter__(self) -> 'AsyncRateLimiter':
+        await self._slots.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        asyncio.get_running_loop().call_later(self.window, self._slots.release)
+
+
+class ScraperSession:
+    """
+    One shared browser with a fixed set of worker contexts, one page each.
+
+    Tasks borrow a page with `async with session.acquire_page() as page:`; at
+    most `max_contexts` navigations run at once, and the least-used idle
+    context is handed out. A context is closed and replaced after MAX_USES
+    pages or MAX_AGE_S seconds, so cookies and renderer memory don't pile up
+    over a long run while Chromium itself is only launched once.
+    """
+
+    MAX_USES = 50
+    MAX_AGE_S = 300
+
+    def __init__(self, max_contexts: int = 5, user_agent: Optional[str] = None,
+                 block_resources: bool = True, headless: bool = True,
+                 page_initiator: Optional[Callable[[Page], Awaitable[None]]] = None,
+                 launch_args: Optional[List[str]] = None, browser: Optional[Browser] = None,
+                 context_options: Optional[Dict[str, Any]] = None):
+        self.max_contexts = max_contexts
+        self.user_agent = user_agent
+        self.block_resources = block_resources
+        self.headless = headless
+        self.page_initiator = page_initiator  # Per-page setup (viewport, routes, ...)
+        self.launch_args = launch_args or []  # Extra Chromium flags
+        self.browser = browser  # Borrowed (e.g. from get_or_create_browser) if given
+        self.context_options = context_options or {}  # Passed to new_context (viewport, locale, proxy, ...)
+        self._owns_browser = browser is None
+        self._playwright = None
+        self._slots: List[_ContextSlot] = []
+        self._idle: List[_ContextSlot] = []
+        self._available: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'ScraperSession':
+        if self._owns_browser:
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+        for _ in range(self.max_contexts):
+            slot = await self._new_slot()
+            self._slots.append(slot)
+            self._idle.append(slot)
+        self._available = asyncio.Semaphore(len(self._idle))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for slot in self._slots:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        self._slots.clear()
+        self._idle.clear()
+        if self._owns_browser:
+            await self.browser.close()
+            await self._playwright.stop()
+
+    async def _new_slot(self) -> '_ContextSlot':
+        options = dict(self.context_options)
+        if self.user_agent:
+            options['user_agent'] = self.user_agent
+        context = await self.browser.new_context(**options)
+        if self.block_resources:
+            await context.route("**/*", block_heavy_resources)
+        page = await context.new_page()
+        if self.page_initiator:
+            await self.page_initiator(page)
+        return _ContextSlot(context, page)
+
+    async def _recycle(self, slot: '_ContextSlot') -> '_ContextSlot':
+        """Replace a worn-out context with a fresh one in the same slot."""
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+        fresh = await self._new_slot()
+        self._slots[self._slots.index(slot)] = fresh
+        return fresh
+
+    @asynccontextmanager
+    async def acquire_page(self) -> AsyncIterator[Page]:
+        """Borrow the page of the least-used idle context, waiting if all are busy."""
+        await self._available.acquire()
+        slot = min(self._idle, key=lambda s: s.uses)
+        self._idle.remove(slot)
+        try:
+            yield slot.page
+        finally:
+            slot.uses += 1
+            if slot.uses >= self.MAX_USES or time.monotonic() - slot.born > self.MAX_AGE_S:
+                try:
+                    slot = await self._recycle(slot)
+                except Exception as e:
+                    print(f"  Error recycling browser context: {e}")
+            self._idle.append(slot)
+            self._available.release()
+
+
+class _ContextSlot:
+    """A worker context, its page, and how worn it is."""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.born = time.monotonic()
@@ -2,47 +2,65 @@
 """Extract AliExpress URLs from validate_suppliers_complete.py output or create from CSV"""
 
 import csv
-import re
+import itertools
+from typing import NamedTuple
+from urllib.parse import quote_plus
+
+MAX_PRODUCTS = 10  # Just first 10 for testing
+
+
+class Product(NamedTuple):
+    """One output row; field order is the CSV column order."""
+    original_title: str
+    original_url: str
+    original_price: str
+    keyword: str
+    aliexpress_url: str
+    alternative_urls: str
+
+
+def iter_products(filename='potential_winners.csv'):
+    """Yield output rows for valid Amazon products, reading the input lazily."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            title = row.get('title', '').strip()
+            url = row.get('url', '')
+            keyword = row.get('keyword', '').strip()
+
+            if title and title != 'Sponsored ' and 'amazon.com' in url and keyword:
+                # Create a search URL that Apify can use
+                # For now, we'll create placeholder URLs that can be updated
+                aliexpress_search_url = f"https://www.aliexpress.com/wholesale?SearchText={quote_plus(keyword)}"
+                yield Product(
+                    original_title=title,
+                    original_url=url,
+                    original_price=row.get('price', ''),
+                    keyword=keyword,
+                    aliexpress_url=aliexpress_search_url,  # This will need actual product URLs
+                    alternative_urls=''
+                )
+
 
 # Read potential_winners.csv and create a simple aliexpress_equivalents.csv
-# We'll use the keyword to construct search URLs for now
-
-products = []
-with open('potential_winners.csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        title = row.get('title', '').strip()
-        url = row.get('url', '')
-        keyword = row.get('keyword', '').strip()
-        
-        if title and title != 'Sponsored ' and 'amazon.com' in url and keyword:
-            # Create a search URL that Apify can use
-            # For now, we'll create placeholder URLs that can be updated
-            search_term = keyword.replace(' ', '+')
-            aliexpress_search_url = f"https://www.aliexpress.com/wholesale?SearchText={search_term}"
-            
-            products.append({
-                'original_title': title,
-                'original_url': url,
-                'original_price': row.get('price', ''),
-                'keyword': keyword,
-                'aliexpress_url': aliexpress_search_url,  # This will need actual product URLs
-                'alternative_urls': ''
-            })
+# We'll use the keyword to construct search URLs for now.
+# read -> filter -> write is one generator chain, so memory stays constant.
+rows = itertools.islice(iter_products(), MAX_PRODUCTS)
+first = next(rows, None)
 
 # For now, let's use a simpler approach - extract from validate_suppliers_complete if it ran
 # Or create a minimal version with search terms
 
-if products:
-    with open('aliexpress_equivalents.csv', 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['original_title', 'original_url', 'original_price', 'keyword', 
-                     'aliexpress_url', 'alternative_urls']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(products[:10])  # Just first 10 for testing
-    
-    print(f"Created aliexpress_equivalents.csv with {len(products[:10])} products (search URLs)")
+if first is not None:
+    # Only opened once there is something to write, so an existing file survives a run with no matches
+    with open('aliexpress_equivalents.csv', 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(Product._fields)
+        writer.writerow(first)
+        count = 1
+        for count, row in enumerate(rows, 2):
+            writer.writerow(row)
+
+    print(f"Created aliexpress_equivalents.csv with {count} products (search URLs)")
     print("Note: These are search URLs. We need actual product URLs from AliExpress.")
 else:
     print("No products found")
-
@@ -1,13 +1,53 @@
 
 import asyncio
 import csv
+import random
 import re
 import os
 from datetime import datetime
-from playwright.async_api import async_playwright
+
+MAX_CONCURRENT_PAGES = 6
+
+# The Mac user agent is the one that proved to work; the others spread load
+USER_AGENTS = [
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+]
+
+STORE_NAME_SELECTOR = '.store-name, .shop-name, .seller-name'
+STORE_INFO_SELECTOR = '.store-detail, .shop-info, [class*="seller"]'
+
+# Only text is read, so these resource types are never downloaded
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media', 'stylesheet'}
+
+_FEEDBACK_RE = re.compile(r'(\d+(?:\.\d+)?)%\s*[Pp]ositive')
+_SINCE_RE = re.compile(r'[Ss]ince\s+(\d{4})')
+_CURRENT_YEAR = datetime.now().year  # Captured once per run
+
+async def block_heavy_resources(route):
+    """Route handler that aborts images, fonts, media and stylesheets."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def read_store_text(page):
+    """Text of the store-info block; falls back to the full body if it's incomplete."""
+    text = '\n'.join(await page.locator(STORE_INFO_SELECTOR).all_inner_texts())
+    if _FEEDBACK_RE.search(text) and _SINCE_RE.search(text):
+        return text
+    return await page.inner_text('body')
+
+def reject(red_flag):
+    """Report a disqualifying red flag; returns None so callers can `return reject(...)`."""
+    print(f"  ✗ RED FLAGS: {red_flag}")
+    return None
 
 async def validate_product(page, product):
     """Validate a single product using the robust debug logic."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
     url = product.get('url', '').strip()
     if not url: 
         return None
@@ -18,70 +58,76 @@ async def validate_product(page, product):
     try:
         # Navigate with simple timeout, NO networkidle
         await page.goto(url, timeout=60000)
-        await page.wait_for_timeout(5000) # Initial load wait
-        
-        # Scroll to bottom for lazy loading
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await page.wait_for_timeout(5000) # Post-scroll wait
+        await page.wait_for_load_state('domcontentloaded')
         
-        # Get body text
-        body_text = await page.inner_text('body')
-        
-        # Store Info Container
-        store_info = {
-            'product_title': product.get('title'),
-            'product_price': product.get('price'),
-            'product_url': url,
-            'store_name': None,
-            'feedback_percentage': None,
-            'store_open_date': None,
-            'shipping_days': 30, # Default
-            'red_flags': []
-        }
+        # Wait for the store block instead of a fixed sleep
+        try:
+            await page.wait_for_selector(STORE_NAME_SELECTOR, timeout=8000)
+        except PlaywrightTimeoutError:
+            pass
         
         # 1. Store Name
         # Try selectors first
-        name_elem = await page.query_selector('.store-name, .shop-name, .seller-name')
+        store_name = None
+        name_elem = await page.query_selector(STORE_NAME_SELECTOR)
         if name_elem:
-            store_info['store_name'] = await name_elem.inner_text()
+            store_name = await name_elem.inner_text()
+        
+        # Get store text (avoids serializing the whole DOM when possible)
+        body_text = await read_store_text(page)
         
         # Fallback: specific text search
-        if not store_info['store_name']:
+        if not store_name:
             if "foreverlily" in body_text.lower():
-                store_info['store_name'] = "ForeverLily Store"
+                store_name = "ForeverLily Store"
             # Add other common store checks here if needed
         
+        # Each check below is disqualifying on its own, so stop at the first failure
+        if not store_name:
+            return reject("Could not find store name")
+        
         # 2. Feedback
-        match = re.search(r'(\d+(\.\d+)?)%\s*[Pp]ositive', body_text)
-        if match:
-            store_info['feedback_percentage'] = float(match.group(1))
-            
+        # Feedback is sometimes lazy-loaded; only scroll when it's missing
+        match = _FEEDBACK_RE.search(body_text)
+        if not match:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            try:
+                await page.wait_for_function(
+                    "() => /\\d%\\s*positive/i.test(document.body.innerText)", timeout=5000
+                )
+            except PlaywrightTimeoutError:
+                pass
+            body_text = await read_store_text(page)
+            match = _FEEDBACK_RE.search(body_text)
+        
+        feedback = float(match.group(1)) if match else None
+        if not feedback:
+            return reject("Could not find feedback")
+        if feedback < 90:
+            return reject(f"Low feedback: {feedback}%")
+        
         # 3. Open Date
-        since_match = re.search(r'[Ss]ince\s+(\d{4})', body_text)
-        if since_match:
-             store_info['store_open_date'] = f"01/01/{since_match.group(1)}"
-             store_info['store_age_years'] = datetime.now().year - int(since_match.group(1))
+        since_match = _SINCE_RE.search(body_text)
+        if not since_match:
+            return reject("Could not find open date")
+        store_age_years = _CURRENT_YEAR - int(since_match.group(1))
+        if store_age_years < 1:
+            return reject("Store < 1 year old")
         
-        # Validation Logic
-        if not store_info['store_name']:
-            store_info['red_flags'].append("Could not find store name")
-            
-        if not store_info['feedback_percentage']:
-             store_info['red_flags'].append("Could not find feedback")
-        elif store_info['feedback_percentage'] < 90:
-             store_info['red_flags'].append(f"Low feedback: {store_info['feedback_percentage']}%")
-             
-        if not store_info['store_open_date']:
-            store_info['red_flags'].append("Could not find open date")
-        elif store_info.get('store_age_years', 0) < 1:
-            store_info['red_flags'].append("Store < 1 year old")
-
-        if store_info['red_flags']:
-            print(f"  ✗ RED FLAGS: {', '.join(store_info['red_flags'])}")
-            return None
-        else:
-            print(f"  ✓ VALIDATED: {store_info['store_name']} (Since {store_info['store_open_date']}, {store_info['feedback_percentage']}%)")
-            return store_info
+        # All checks passed: build the result
+        store_info = {
+            'product_title': product.get('title'),
+            'product_price': product.get('price'),
+            'product_url': url,
+            'store_name': store_name,
+            'feedback_percentage': feedback,
+            'store_open_date': f"01/01/{since_match.group(1)}",
+            'shipping_days': 30, # Default
+            'red_flags': [],
+            'store_age_years': store_age_years
+        }
+        print(f"  ✓ VALIDATED: {store_info['store_name']} (Since {store_info['store_open_date']}, {store_info['feedback_percentage']}%)")
+        return store_info
 
     except Exception as e:
         print(f"  Error validating: {e}")
@@ -103,23 +149,29 @@ async def main():
     
     print(f"Found {len(products)} products to validate.")
     
+    # Imported here so reading the input doesn't pay playwright's import cost
+    from playwright.async_api import async_playwright
+    
     # Launch browser - SIMPLE CONFIG
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        # Use the specific Mac User Agent that worked
-        page = await browser.new_page(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
         
-        validated_list = []
+        # One browser, one isolated context (own cookies + UA) per product;
+        # the semaphore caps how many pages are open at once
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+        
+        async def worker(product):
+            async with semaphore:
+                context = await browser.new_context(user_agent=random.choice(USER_AGENTS))
+                await context.route('**/*', block_heavy_resources)
+                page = await context.new_page()
+                try:
+                    return await validate_product(page, product)
+                finally:
+                    await context.close()
         
-        for i, product in enumerate(products, 1):
-            result = await validate_product(page, product)
-            if result:
-                validated_list.append(result)
-            
-            if i < len(products):
-                await asyncio.sleep(5) # Safe delay
+        results = await asyncio.gather(*(worker(product) for product in products))
+        validated_list = [result for result in results if result]
         
         await browser.close()
         
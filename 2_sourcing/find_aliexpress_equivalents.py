@@ -6,8 +6,15 @@ Searches AliExpress for products similar to Amazon products in the CSV
 
 import csv
 import asyncio
-from playwright.async_api import async_playwright, Page
+import contextlib
+import itertools
+import random
+from playwright.async_api import Page
 import re
+from browser_pool import ScraperSession, close_popups_once
+
+MAX_PARALLEL = 5  # Concurrent search pages
+RESULTS_TIMEOUT = 15000  # ms to wait for search results after DOMContentLoaded
 
 
 async def search_aliexpress(page: Page, product_title: str, max_results: int = 5):
@@ -19,20 +26,14 @@ async def search_aliexpress(page: Page, product_title: str, max_results: int = 5
     try:
         # Search AliExpress
         search_url = f"https://www.aliexpress.com/wholesale?SearchText={search_query.replace(' ', '+')}"
-        await page.goto(search_url, wait_until="networkidle", timeout=60000)
-        await page.wait_for_timeout(3000)
-        
-        # Handle popups
+        await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
         try:
-            close_buttons = await page.query_selector_all('button, [class*="close"]')
-            for btn in close_buttons[:2]:
-                try:
-                    await btn.click(timeout=2000)
-                    await page.wait_for_timeout(500)
-                except:
-                    pass
+            await page.wait_for_selector('a[href*="/item/"]', timeout=RESULTS_TIMEOUT)
         except:
-            pass
+            pass  # No results rendered; the link query below comes back empty
+        
+        # Handle popups (once per context)
+        await close_popups_once(page)
         
         # Find product links
         product_links = await page.query_selector_all('a[href*="/item/"]')
@@ -64,78 +65,107 @@ async def search_aliexpress(page: Page, product_title: str, max_results: int = 5
         return []
 
 
-async def main():
-    """Find AliExpress equivalents for products in CSV."""
+OUTPUT_FIELDS = ['original_title', 'original_url', 'original_price', 'keyword',
+                 'aliexpress_url', 'alternative_urls']
+
+
+def iter_products(filename='potential_winners.csv'):
+    """Yield valid Amazon products from the CSV, reading it lazily."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            title = row.get('title', '').strip()
+            url = row.get('url', '')
+            # Only process valid Amazon products
+            if title and title != 'Sponsored ' and 'amazon.com' in url:
+                yield {
+                    'title': title,
+                    'url': url,
+                    'price': row.get('price', ''),
+                    'keyword': row.get('keyword', '')
+                }
+
+
+async def main(session: ScraperSession = None):
+    """Find AliExpress equivalents for products in CSV (reusing `session`'s browser if given)."""
     print("=" * 70)
     print("FINDING ALIEXPRESS EQUIVALENTS")
     print("=" * 70)
     
-    # Read products from CSV
-    products = []
+    # Products are read as workers ask for them, so searching starts right away
     try:
-        with open('potential_winners.csv', 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                title = row.get('title', '').strip()
-                url = row.get('url', '')
-                # Only process valid Amazon products
-                if title and title != 'Sponsored ' and 'amazon.com' in url:
-                    products.append({
-                        'title': title,
-                        'url': url,
-                        'price': row.get('price', ''),
-                        'keyword': row.get('keyword', '')
-                    })
+        products = enumerate(iter_products(), 1)
+        first = next(products, None)
     except Exception as e:
         print(f"Error reading CSV: {e}")
         return
     
-    print(f"\nFound {len(products)} Amazon products to find equivalents for\n")
+    if first is None:
+        print("\nFound 0 Amazon products to find equivalents for")
+        print("\nNo AliExpress equivalents found.")
+        return
+    products = itertools.chain([first], products)
+    
+    searched = 0
+    saved = 0
     
-    # Create output CSV with AliExpress URLs
-    output_rows = []
+    # Rows are flushed as each search finishes, so a crash keeps what was found.
+    # The file is only opened on the first match, so a run that finds nothing
+    # (or dies before any search completes) leaves the previous output alone.
+    out = None
+    writer = None
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        )
-        page = await context.new_page()
-        
-        for i, product in enumerate(products, 1):
-            print(f"{i}/{len(products)}. Searching for: {product['title'][:60]}...")
-            
-            aliexpress_urls = await search_aliexpress(page, product['title'], max_results=3)
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            if session is None:
+                session = await stack.enter_async_context(ScraperSession(
+                    max_contexts=MAX_PARALLEL,
+                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                ))
             
-            if aliexpress_urls:
-                # Use first result as primary
-                output_rows.append({
-                    'original_title': product['title'],
-                    'original_url': product['url'],
-                    'original_price': product['price'],
-                    'keyword': product['keyword'],
-                    'aliexpress_url': aliexpress_urls[0],
-                    'alternative_urls': ' | '.join(aliexpress_urls[1:]) if len(aliexpress_urls) > 1 else ''
-                })
-                print(f"   ✓ Found {len(aliexpress_urls)} AliExpress equivalent(s)")
-            else:
-                print(f"   ✗ No equivalents found")
+            # Up to MAX_PARALLEL searches run at once, one per worker context
+            async def worker():
+                nonlocal searched, saved, out, writer
+                # Workers share one iterator; next() never yields to the event loop
+                for i, product in products:
+                    async with session.acquire_page() as page:
+                        print(f"{i}. Searching for: {product['title'][:60]}...")
+                        aliexpress_urls = await search_aliexpress(page, product['title'], max_results=3)
+                    searched += 1
+                    
+                    if aliexpress_urls:
+                        if writer is None:
+                            out = open('aliexpress_equivalents.csv', 'w', newline='', encoding='utf-8')
+                            writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS)
+                            writer.writeheader()
+                        # Use first result as primary
+                        writer.writerow({
+                            'original_title': product['title'],
+                            'original_url': product['url'],
+                            'original_price': product['price'],
+                            'keyword': product['keyword'],
+                            'aliexpress_url': aliexpress_urls[0],
+                            'alternative_urls': ' | '.join(aliexpress_urls[1:]) if len(aliexpress_urls) > 1 else ''
+                        })
+                        out.flush()
+                        saved += 1
+                        print(f"   ✓ Found {len(aliexpress_urls)} AliExpress equivalent(s) for: {product['title'][:50]}")
+                    else:
+                        print(f"   ✗ No equivalents found for: {product['title'][:50]}")
+                    
+                    # Rate limiting: jitter per worker, so searches don't hit AliExpress
+                    # in lockstep; the page is already back in the pool meanwhile
+                    await asyncio.sleep(random.uniform(1.0, 3.0))
             
-            await page.wait_for_timeout(3000)  # Rate limiting
-        
-        await browser.close()
+            await asyncio.gather(*(worker() for _ in range(MAX_PARALLEL)))
+    finally:
+        if out is not None:
+            out.close()
     
-    # Save to CSV
-    if output_rows:
-        with open('aliexpress_equivalents.csv', 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['original_title', 'original_url', 'original_price', 'keyword', 
-                         'aliexpress_url', 'alternative_urls']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(output_rows)
-        
+    print(f"\nSearched {searched} Amazon products")
+    if saved:
         print(f"\n{'='*70}")
-        print(f"✓ Saved {len(output_rows)} AliExpress equivalents to aliexpress_equivalents.csv")
+        print(f"✓ Saved {saved} AliExpress equivalents to aliexpress_equivalents.csv")
         print(f"{'='*70}")
         print("\nNext step: Run supplier_validator.py with the aliexpress_equivalents.csv")
     else:
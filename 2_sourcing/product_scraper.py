@@ -5,11 +5,133 @@ Scrapes AliExpress and Amazon Best Sellers to find winning products
 """
 
 import asyncio
+import contextlib
 import csv
+import json
+import os
+import random
 import re
-from typing import List, Dict, Optional
-from playwright.async_api import async_playwright, Page, Browser
+from collections import Counter, defaultdict
+import numpy as np
+from typing import Final, List, Dict, Optional
+from urllib.parse import urlparse
+from playwright.async_api import Page
 import time
+from browser_pool import (ANTI_BOT_MARKERS, BLOCKED_STATUS_CODES, ScraperSession, aliexpress_search_url,
+                          close_popups_once, scroll_until)
+
+try:
+    import httpx
+    from selectolax.lexbor import LexborHTMLParser
+    HTTP_SCRAPING_AVAILABLE = True
+except ImportError:
+    HTTP_SCRAPING_AVAILABLE = False
+
+MAX_CONCURRENT_PAGES = 5  # Pages scraping (keyword, site) pairs in parallel
+# Plain HTTP listing requests in flight per site; Amazon blocks bursts much sooner
+MAX_CONCURRENT_HTTP = {'AliExpress': 10, 'Amazon': 3}
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+# Rotated per plain HTTP request
+USER_AGENTS = [
+    USER_AGENT,
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+]
+RESULTS_TIMEOUT = 15000  # ms to wait for search results after DOMContentLoaded
+
+CSV_COLUMNS = ('title', 'price', 'orders', 'reviews', 'rating', 'opportunity_score', 'source', 'keyword', 'url')
+
+# Politeness: requests to the same domain start at least this many seconds apart
+DOMAIN_DELAY_RANGE = (2.0, 5.0)
+# Throttled navigations are retried after 2s, 4s, 8s
+RETRY_STATUS_CODES = (429, 503)
+MAX_RETRIES = 3
+BACKOFF_BASE = 2.0
+
+# Keywords finished so far, so a crashed run resumes instead of starting over
+CHECKPOINT_FILE = '_checkpoint.json'
+
+# Parsing helpers run once per field per card, so patterns are compiled once here
+_NUM_FLOAT = re.compile(r'(\d+\.?\d*)')
+_NUM_INT = re.compile(r'(\d+)')
+_CURRENCY_TRANS = str.maketrans('', '', ',$€£')
+
+# Opportunity score buckets (see score_products), out of 100: high demand
+# (orders, 0-50), low competition (reviews, 0-30), good rating (0-20), plus a
+# 10 point bonus for orders > 500 with reviews < 100.
+# Orders: strictly above a threshold earns the next bucket's points.
+_ORDER_THRESHOLDS = np.array([100, 500, 1000, 5000, 10000])
+_ORDER_POINTS = np.array([0, 10, 20, 30, 40, 50])
+# Reviews: at or above a threshold drops to the next (lower) bucket
+_REVIEW_THRESHOLDS = np.array([50, 100, 500, 1000])
+_REVIEW_POINTS = np.array([30, 20, 10, 5, 0])
+# Rating: at or above a threshold earns the next bucket's points
+_RATING_THRESHOLDS = np.array([3.0, 3.5, 4.0, 4.5])
+_RATING_POINTS = np.array([0, 5, 10, 15, 20])
+
+# Card selectors, one variant per site layout seen so far
+ALIEXPRESS_CARD_VARIANTS: Final = ('[class*="product-card"]', '[class*="list--gallery"]', '[data-widget-cid]')
+ALIEXPRESS_CARD_SELECTORS: Final = ', '.join(ALIEXPRESS_CARD_VARIANTS)
+ALIEXPRESS_CARD_FALLBACK: Final = 'a[href*="/item/"]'
+
+AMAZON_CARD_VARIANTS: Final = ('[data-component-type="s-search-result"]',)
+AMAZON_CARD_SELECTORS: Final = ', '.join(AMAZON_CARD_VARIANTS)
+AMAZON_CARD_FALLBACK: Final = '[class*="s-result-item"]'
+
+# Card extraction runs inside the page in one evaluate() call per card list,
+# instead of a query_selector/inner_text round trip per field per card.
+# Each returns {selector, cards: [{title, price, orders, rating, reviews, href}, ...]}
+# of raw text. `preferred` is the variant that matched last time and is tried on
+# its own first; `selector` reports which variant matched this time (null when
+# only the fallback did, which matches nearly anything and is never worth preferring).
+_FIND_CARDS_JS = """
+    let cards = preferred ? Array.from(document.querySelectorAll(preferred)) : [];
+    if (!cards.length) cards = Array.from(document.querySelectorAll(variants.join(', ')));
+    if (!cards.length) cards = Array.from(document.querySelectorAll(fallbackSelector));
+    const selector = cards.length ? variants.find(v => cards[0].matches(v)) ?? null : null;
+    const text = (card, sel) => card.querySelector(sel)?.innerText ?? null;
+"""
+
+ALIEXPRESS_CARDS_JS: Final = """
+([preferred, variants, fallbackSelector, limit]) => {""" + _FIND_CARDS_JS + """
+    return {selector, cards: cards.slice(0, limit).map(card => ({
+        title: text(card, '[class*="title"], h1, h2, h3, [class*="product-title"]') ?? card.getAttribute('title'),
+        price: text(card, '[class*="price"], [class*="price-current"], [class*="price-value"]'),
+        orders: text(card, '[class*="order"], [class*="sold"], [class*="sales"]'),
+        rating: text(card, '[class*="rating"], [class*="star"], [class*="score"]'),
+        reviews: text(card, '[class*="review"], [class*="feedback"]'),
+        href: card.querySelector('a')?.getAttribute('href') ?? null,
+    }))};
+}
+"""
+
+AMAZON_CARDS_JS: Final = """
+([preferred, variants, fallbackSelector, limit]) => {""" + _FIND_CARDS_JS + """
+    return {selector, cards: cards.slice(0, limit).map(card => ({
+        title: text(card, 'h2 a span, [data-cy="title-recipe"] span, .s-title-instructions-style span') ?? text(card, 'h2 a'),
+        price: text(card, '.a-price-whole, .a-offscreen, [class*="price"]') ?? text(card, '.a-price .a-offscreen'),
+        rating: text(card, '[aria-label*="stars"], .a-icon-alt, [class*="rating"]'),
+        reviews: text(card, 'a[href*="#customerReviews"], [aria-label*="ratings"], [class*="review"]'),
+        href: card.querySelector('h2 a, [data-cy="title-recipe"] a')?.getAttribute('href') ?? null,
+    }))};
+}
+"""
+
+
+def _node_text(node, selector: str) -> Optional[str]:
+    """Text of the first match under node, or None (selectolax counterpart of the JS helpers)."""
+    match = node.css_first(selector)
+    return match.text() if match is not None else None
+
+
+def _node_href(node, selector: str) -> Optional[str]:
+    match = node.css_first(selector)
+    return match.attributes.get('href') if match is not None else None
+
+
+def amazon_search_url(keyword: str) -> str:
+    return f"https://www.amazon.com/s?k={keyword.replace(' ', '+')}&rh=n%3A3760901%2Cn%3A11055981"  # Beauty & Personal Care category
 
 
 class ProductScraper:
@@ -17,6 +139,10 @@ class ProductScraper:
     
     def __init__(self):
         self.products = []
+        # Domain -> start time of its latest (possibly still upcoming) request
+        self._domain_last_hit: Dict[str, float] = {}
+        # Site -> card selector variant that matched last; tried alone first next time
+        self._winning_card_selector: Dict[str, str] = {}
         self.keywords = [
             "LED face mask",
             "skincare device",
@@ -30,54 +156,30 @@ class ProductScraper:
             "beauty gadget"
         ]
     
-    def calculate_opportunity_score(self, orders: int, reviews: int, rating: float = 0) -> float:
+    def score_products(self, products: List[Dict]) -> None:
         """
-        Calculate opportunity score based on:
-        - High Demand: Orders > 500
-        - Low Competition: Reviews < 100
-        - Good Rating: Rating >= 4.0
-        
-        Returns score from 0-100
+        Compute opportunity_score (0-100) for all products at once:
+        high demand (orders > 500), low competition (reviews < 100) and a
+        good rating (>= 4.0) score highest. The buckets are array lookups in
+        the tables above rather than an if/elif ladder per product.
         """
-        score = 0.0
-        
-        # High demand component (0-50 points)
-        if orders > 10000:
-            score += 50
-        elif orders > 5000:
-            score += 40
-        elif orders > 1000:
-            score += 30
-        elif orders > 500:
-            score += 20
-        elif orders > 100:
-            score += 10
-        
-        # Low competition component (0-30 points)
-        if reviews < 50:
-            score += 30
-        elif reviews < 100:
-            score += 20
-        elif reviews < 500:
-            score += 10
-        elif reviews < 1000:
-            score += 5
-        
-        # Rating component (0-20 points)
-        if rating >= 4.5:
-            score += 20
-        elif rating >= 4.0:
-            score += 15
-        elif rating >= 3.5:
-            score += 10
-        elif rating >= 3.0:
-            score += 5
-        
-        # Bonus: High demand + Low competition combo
-        if orders > 500 and reviews < 100:
-            score += 10
-        
-        return min(100.0, score)
+        if not products:
+            return
+        
+        orders = np.array([p['orders'] for p in products])
+        reviews = np.array([p['reviews'] for p in products])
+        ratings = np.array([p['rating'] for p in products], dtype=float)
+        
+        scores = (
+            _ORDER_POINTS[np.searchsorted(_ORDER_THRESHOLDS, orders, side='left')]
+            + _REVIEW_POINTS[np.searchsorted(_REVIEW_THRESHOLDS, reviews, side='right')]
+            + _RATING_POINTS[np.searchsorted(_RATING_THRESHOLDS, ratings, side='right')]
+            + np.where((orders > 500) & (reviews < 100), 10, 0)  # High demand + low competition combo
+        )
+        scores = np.minimum(100.0, scores)
+        
+        for product, score in zip(products, scores.tolist()):
+            product['opportunity_score'] = score
     
     def parse_price(self, price_text: str) -> Optional[float]:
         """Parse price from text string."""
@@ -85,9 +187,9 @@ class ProductScraper:
             return None
         
         # Remove currency symbols and extract numbers
-        price_text = price_text.replace(',', '').replace('$', '').replace('€', '').replace('£', '')
+        price_text = price_text.translate(_CURRENCY_TRANS)
         # Extract first number found
-        match = re.search(r'(\d+\.?\d*)', price_text)
+        match = _NUM_FLOAT.search(price_text)
         if match:
             try:
                 return float(match.group(1))
@@ -115,7 +217,7 @@ class ProductScraper:
                 return 0
         else:
             # Extract first number
-            match = re.search(r'(\d+)', text)
+            match = _NUM_INT.search(text)
             if match:
                 try:
                     return int(match.group(1))
@@ -129,7 +231,7 @@ class ProductScraper:
             return 0.0
         
         # Extract first decimal number
-        match = re.search(r'(\d+\.?\d*)', rating_text)
+        match = _NUM_FLOAT.search(rating_text)
         if match:
             try:
                 rating = float(match.group(1))
@@ -141,6 +243,213 @@ class ProductScraper:
                 return 0.0
         return 0.0
     
+    async def wait_for_domain(self, url: str):
+        """
+        Space out request starts per domain by a random delay instead of a fixed sleep.
+        Each caller reserves its start time up front and sleeps without holding
+        anything, so requests still overlap in flight (up to MAX_CONCURRENT_HTTP).
+        """
+        domain = urlparse(url).netloc
+        now = time.monotonic()
+        last_hit = self._domain_last_hit.get(domain)
+        start = now if last_hit is None else max(now, last_hit + random.uniform(*DOMAIN_DELAY_RANGE))
+        self._domain_last_hit[domain] = start
+        if start > now:
+            await asyncio.sleep(start - now)
+    
+    async def goto(self, page: Page, url: str):
+        """Navigate politely, backing off exponentially while the site throttles us."""
+        for attempt in range(MAX_RETRIES + 1):
+            await self.wait_for_domain(url)
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            if response is None or response.status not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            delay = BACKOFF_BASE * (2 ** attempt)
+            print(f"  ⚠ {urlparse(url).netloc} returned {response.status}, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+    
+    async def extract_cards(self, page: Page, source: str, cards_js: str, variants: tuple,
+                            fallback: str, max_products: int) -> List[Dict]:
+        """Run a *_CARDS_JS extractor, remembering which selector variant this site uses."""
+        result = await page.evaluate(cards_js, [
+            self._winning_card_selector.get(source),
+            list(variants),
+            fallback,  # Alternative selector
+            max_products,
+        ])
+        # Only a layout variant is remembered, never the generic fallback
+        if result['selector'] in variants:
+            self._winning_card_selector[source] = result['selector']
+        return result['cards']
+    
+    def load_checkpoint(self) -> Dict[str, Dict[str, List[Dict]]]:
+        """Return {keyword: {source: products}} saved by an interrupted run."""
+        try:
+            with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_checkpoint(self, done: Dict[str, Dict[str, List[Dict]]]):
+        """Persist finished keywords (written atomically so a crash can't truncate it)."""
+        tmp_path = f"{CHECKPOINT_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(done, f)
+        os.replace(tmp_path, CHECKPOINT_FILE)
+    
+    def aliexpress_product(self, card: Dict, keyword: str) -> Optional[Dict]:
+        """Turn one raw AliExpress card (field -> text) into a product, or None if untitled."""
+        product_data = {}
+        
+        product_data['title'] = card['title'] or "N/A"
+        product_data['price'] = self.parse_price(card['price']) if card['price'] else None
+        product_data['orders'] = self.parse_number(card['orders']) if card['orders'] else 0
+        product_data['rating'] = self.parse_rating(card['rating']) if card['rating'] else 0.0
+        product_data['reviews'] = self.parse_number(card['reviews']) if card['reviews'] else 0
+        
+        # Get product URL
+        href = card['href']
+        if href:
+            if href.startswith('/'):
+                product_data['url'] = f"https://www.aliexpress.com{href}"
+            else:
+                product_data['url'] = href
+        else:
+            product_data['url'] = "N/A"
+        
+        product_data['source'] = 'AliExpress'
+        product_data['keyword'] = keyword
+        
+        if product_data['title'] and product_data['title'] != "N/A":
+            return product_data
+        return None
+    
+    def amazon_product(self, card: Dict, keyword: str) -> Optional[Dict]:
+        """Turn one raw Amazon card (field -> text) into a product, or None if untitled."""
+        product_data = {}
+        
+        product_data['title'] = card['title'] or "N/A"
+        product_data['price'] = self.parse_price(card['price']) if card['price'] else None
+        product_data['rating'] = self.parse_rating(card['rating']) if card['rating'] else 0.0
+        product_data['reviews'] = self.parse_number(card['reviews']) if card['reviews'] else 0
+        
+        # Amazon doesn't show orders, use reviews as proxy
+        product_data['orders'] = product_data['reviews']  # Use reviews as proxy for demand
+        
+        # Get product URL
+        href = card['href']
+        if href:
+            if href.startswith('/'):
+                product_data['url'] = f"https://www.amazon.com{href.split('?')[0]}"
+            else:
+                product_data['url'] = href.split('?')[0]
+        else:
+            product_data['url'] = "N/A"
+        
+        product_data['source'] = 'Amazon'
+        product_data['keyword'] = keyword
+        
+        if product_data['title'] and product_data['title'] != "N/A":
+            return product_data
+        return None
+    
+    def parse_aliexpress_cards(self, html: str, max_products: int) -> List[Dict]:
+        """Extract raw AliExpress cards from listing HTML (same fields as ALIEXPRESS_CARDS_JS)."""
+        tree = LexborHTMLParser(html)
+        cards = tree.css(ALIEXPRESS_CARD_SELECTORS) or tree.css(ALIEXPRESS_CARD_FALLBACK)
+        
+        raw_cards = []
+        for card in cards[:max_products]:
+            title = _node_text(card, '[class*="title"], h1, h2, h3, [class*="product-title"]')
+            raw_cards.append({
+                'title': title if title is not None else card.attributes.get('title'),
+                'price': _node_text(card, '[class*="price"], [class*="price-current"], [class*="price-value"]'),
+                'orders': _node_text(card, '[class*="order"], [class*="sold"], [class*="sales"]'),
+                'rating': _node_text(card, '[class*="rating"], [class*="star"], [class*="score"]'),
+                'reviews': _node_text(card, '[class*="review"], [class*="feedback"]'),
+                'href': _node_href(card, 'a'),
+            })
+        return raw_cards
+    
+    def parse_amazon_cards(self, html: str, max_products: int) -> List[Dict]:
+        """Extract raw Amazon cards from search HTML (same fields as AMAZON_CARDS_JS)."""
+        tree = LexborHTMLParser(html)
+        cards = tree.css(AMAZON_CARD_SELECTORS) or tree.css(AMAZON_CARD_FALLBACK)
+        
+        raw_cards = []
+        for card in cards[:max_products]:
+            title = _node_text(card, 'h2 a span, [data-cy="title-recipe"] span, .s-title-instructions-style span')
+            price = _node_text(card, '.a-price-whole, .a-offscreen, [class*="price"]')
+            raw_cards.append({
+                'title': title if title is not None else _node_text(card, 'h2 a'),
+                'price': price if price is not None else _node_text(card, '.a-price .a-offscreen'),
+                'rating': _node_text(card, '[aria-label*="stars"], .a-icon-alt, [class*="rating"]'),
+                'reviews': _node_text(card, 'a[href*="#customerReviews"], [aria-label*="ratings"], [class*="review"]'),
+                'href': _node_href(card, 'h2 a, [data-cy="title-recipe"] a'),
+            })
+        return raw_cards
+    
+    async def scrape_listing_http(self, client: 'httpx.AsyncClient', source: str, keyword: str,
+                                  max_products: int = 20) -> Optional[List[Dict]]:
+        """
+        Scrape one site's search results over plain HTTP, without a browser.
+        Returns None when the response looks bot-blocked or holds no server-rendered
+        cards, so the caller can fall back to the Playwright scraper.
+        """
+        print(f"Scraping {source} (HTTP) for: {keyword}")
+        if source == 'AliExpress':
+            search_url = aliexpress_search_url(keyword)
+            parse_cards, build_product, label = self.parse_aliexpress_cards, self.aliexpress_product, 'Orders'
+        else:
+            search_url = amazon_search_url(keyword)
+            parse_cards, build_product, label = self.parse_amazon_cards, self.amazon_product, 'Reviews'
+        
+        try:
+            await self.wait_for_domain(search_url)
+            response = await client.get(search_url, headers={'User-Agent': random.choice(USER_AGENTS)})
+        except httpx.HTTPError as e:
+            print(f"  HTTP request failed for {keyword}: {e}")
+            return None
+        
+        if response.status_code in BLOCKED_STATUS_CODES or any(m in response.text for m in ANTI_BOT_MARKERS):
+            print(f"  ⚠ {source} blocked plain HTTP for {keyword}, falling back to browser")
+            return None
+        
+        cards = parse_cards(response.text, max_products)
+        if not cards:
+            return None  # Captcha page, or listing rendered client-side for this query
+        
+        print(f"Found {len(cards)} {source} cards")
+        
+        products = []
+        for card in cards:
+            try:
+                product_data = build_product(card, keyword)
+                if product_data:
+                    products.append(product_data)
+                    print(f"  ✓ Found: {product_data['title'][:50]}... | {label}: {product_data[label.lower()]}")
+            except Exception as e:
+                print(f"  ✗ Error extracting product: {e}")
+        
+        return products
+    
+    async def scrape_all_http(self, tasks: List[tuple], max_products_per_keyword: int) -> Dict:
+        """
+        Run the plain-HTTP listing scrapes for the given (source, keyword) pairs.
+        Returns {(source, keyword): products} for the ones that succeeded.
+        """
+        semaphores = {source: asyncio.Semaphore(limit) for source, limit in MAX_CONCURRENT_HTTP.items()}
+        headers = {'Accept-Language': 'en-US,en;q=0.9'}
+        
+        async with httpx.AsyncClient(http2=True, headers=headers, follow_redirects=True, timeout=30) as client:
+            async def fetch(source: str, keyword: str) -> Optional[List[Dict]]:
+                async with semaphores[source]:
+                    return await self.scrape_listing_http(client, source, keyword, max_products_per_keyword)
+            
+            results = await asyncio.gather(*(fetch(source, keyword) for source, keyword in tasks))
+        
+        return {task: products for task, products in zip(tasks, results) if products is not None}
+    
     async def scrape_aliexpress(self, page: Page, keyword: str, max_products: int = 20) -> List[Dict]:
         """Scrape products from AliExpress."""
         print(f"Scraping AliExpress for: {keyword}")
@@ -148,118 +457,38 @@ class ProductScraper:
         
         try:
             # Navigate to AliExpress search
-            search_url = f"https://www.aliexpress.com/wholesale?SearchText={keyword.replace(' ', '+')}"
-            await page.goto(search_url, wait_until="networkidle", timeout=60000)
+            search_url = aliexpress_search_url(keyword)
+            await self.goto(page, search_url)
             
             # Wait for products to load
-            await page.wait_for_timeout(3000)
-            
-            # Handle potential popups/cookies
             try:
-                # Try to close any popups
-                close_buttons = await page.query_selector_all('button, [class*="close"], [class*="dismiss"]')
-                for btn in close_buttons[:3]:  # Try first 3 close buttons
-                    try:
-                        await btn.click(timeout=2000)
-                        await page.wait_for_timeout(500)
-                    except:
-                        pass
+                await page.wait_for_selector(ALIEXPRESS_CARD_FALLBACK, timeout=RESULTS_TIMEOUT)
             except:
-                pass
+                pass  # Fall through to the selector fallbacks below
             
-            # Scroll to load more products
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
+            # Handle potential popups/cookies (once per context)
+            await close_popups_once(page)
             
-            # Find product cards
-            product_cards = await page.query_selector_all('[class*="product-card"], [class*="list--gallery"], [data-widget-cid]')
+            # Scroll to load more products
+            await scroll_until(page, f'{ALIEXPRESS_CARD_SELECTORS}, {ALIEXPRESS_CARD_FALLBACK}', max_products)
             
-            if not product_cards:
-                # Try alternative selectors
-                product_cards = await page.query_selector_all('a[href*="/item/"]')
+            # Extract all product cards in one round trip
+            cards = await self.extract_cards(page, 'AliExpress', ALIEXPRESS_CARDS_JS, ALIEXPRESS_CARD_VARIANTS,
+                                             ALIEXPRESS_CARD_FALLBACK, max_products)
             
-            print(f"Found {len(product_cards)} product cards")
+            print(f"Found {len(cards)} product cards")
             
-            for card in product_cards[:max_products]:
+            for card in cards:
                 try:
-                    product_data = {}
-                    
-                    # Extract title
-                    title_elem = await card.query_selector('[class*="title"], h1, h2, h3, [class*="product-title"]')
-                    if title_elem:
-                        product_data['title'] = await title_elem.inner_text()
-                    else:
-                        title_attr = await card.get_attribute('title')
-                        product_data['title'] = title_attr or "N/A"
-                    
-                    # Extract price
-                    price_elem = await card.query_selector('[class*="price"], [class*="price-current"], [class*="price-value"]')
-                    if price_elem:
-                        price_text = await price_elem.inner_text()
-                        product_data['price'] = self.parse_price(price_text)
-                    else:
-                        product_data['price'] = None
-                    
-                    # Extract orders
-                    orders_elem = await card.query_selector('[class*="order"], [class*="sold"], [class*="sales"]')
-                    if orders_elem:
-                        orders_text = await orders_elem.inner_text()
-                        product_data['orders'] = self.parse_number(orders_text)
-                    else:
-                        product_data['orders'] = 0
-                    
-                    # Extract rating
-                    rating_elem = await card.query_selector('[class*="rating"], [class*="star"], [class*="score"]')
-                    if rating_elem:
-                        rating_text = await rating_elem.inner_text()
-                        product_data['rating'] = self.parse_rating(rating_text)
-                    else:
-                        product_data['rating'] = 0.0
-                    
-                    # Extract reviews count
-                    reviews_elem = await card.query_selector('[class*="review"], [class*="feedback"]')
-                    if reviews_elem:
-                        reviews_text = await reviews_elem.inner_text()
-                        product_data['reviews'] = self.parse_number(reviews_text)
-                    else:
-                        product_data['reviews'] = 0
-                    
-                    # Get product URL
-                    link_elem = await card.query_selector('a')
-                    if link_elem:
-                        href = await link_elem.get_attribute('href')
-                        if href:
-                            if href.startswith('/'):
-                                product_data['url'] = f"https://www.aliexpress.com{href}"
-                            else:
-                                product_data['url'] = href
-                        else:
-                            product_data['url'] = "N/A"
-                    else:
-                        product_data['url'] = "N/A"
-                    
-                    product_data['source'] = 'AliExpress'
-                    product_data['keyword'] = keyword
-                    
-                    # Calculate opportunity score
-                    product_data['opportunity_score'] = self.calculate_opportunity_score(
-                        product_data['orders'],
-                        product_data['reviews'],
-                        product_data['rating']
-                    )
-                    
-                    if product_data['title'] and product_data['title'] != "N/A":
+                    product_data = self.aliexpress_product(card, keyword)
+                    if product_data:
                         products.append(product_data)
-                        print(f"  ✓ Found: {product_data['title'][:50]}... | Orders: {product_data['orders']} | Score: {product_data['opportunity_score']:.1f}")
+                        print(f"  ✓ Found: {product_data['title'][:50]}... | Orders: {product_data['orders']}")
                 
                 except Exception as e:
                     print(f"  ✗ Error extracting product: {e}")
                     continue
             
-            # Rate limiting
-            await page.wait_for_timeout(2000)
-            
         except Exception as e:
             print(f"Error scraping AliExpress for {keyword}: {e}")
         
@@ -272,11 +501,14 @@ class ProductScraper:
         
         try:
             # Navigate to Amazon search
-            search_url = f"https://www.amazon.com/s?k={keyword.replace(' ', '+')}&rh=n%3A3760901%2Cn%3A11055981"  # Beauty & Personal Care category
-            await page.goto(search_url, wait_until="networkidle", timeout=60000)
+            search_url = amazon_search_url(keyword)
+            await self.goto(page, search_url)
             
             # Wait for products to load
-            await page.wait_for_timeout(3000)
+            try:
+                await page.wait_for_selector(AMAZON_CARD_SELECTORS, timeout=RESULTS_TIMEOUT)
+            except:
+                pass  # Captcha page or layout change; handled below
             
             # Handle potential captcha or sign-in prompts
             try:
@@ -287,176 +519,133 @@ class ProductScraper:
                 pass
             
             # Scroll to load more products
-            for i in range(2):
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-            
-            # Find product containers
-            product_containers = await page.query_selector_all('[data-component-type="s-search-result"]')
+            await scroll_until(page, AMAZON_CARD_SELECTORS, max_products)
             
-            if not product_containers:
-                # Try alternative selector
-                product_containers = await page.query_selector_all('[class*="s-result-item"]')
+            # Extract all product containers in one round trip
+            containers = await self.extract_cards(page, 'Amazon', AMAZON_CARDS_JS, AMAZON_CARD_VARIANTS,
+                                                  AMAZON_CARD_FALLBACK, max_products)
             
-            print(f"Found {len(product_containers)} product containers")
+            print(f"Found {len(containers)} product containers")
             
-            for container in product_containers[:max_products]:
+            for container in containers:
                 try:
-                    product_data = {}
-                    
-                    # Extract title
-                    title_elem = await container.query_selector('h2 a span, [data-cy="title-recipe"] span, .s-title-instructions-style span')
-                    if title_elem:
-                        product_data['title'] = await title_elem.inner_text()
-                    else:
-                        title_link = await container.query_selector('h2 a')
-                        if title_link:
-                            product_data['title'] = await title_link.inner_text()
-                        else:
-                            product_data['title'] = "N/A"
-                    
-                    # Extract price
-                    price_elem = await container.query_selector('.a-price-whole, .a-offscreen, [class*="price"]')
-                    if price_elem:
-                        price_text = await price_elem.inner_text()
-                        product_data['price'] = self.parse_price(price_text)
-                    else:
-                        # Try alternative price selector
-                        price_alt = await container.query_selector('.a-price .a-offscreen')
-                        if price_alt:
-                            price_text = await price_alt.inner_text()
-                            product_data['price'] = self.parse_price(price_text)
-                        else:
-                            product_data['price'] = None
-                    
-                    # Extract rating
-                    rating_elem = await container.query_selector('[aria-label*="stars"], .a-icon-alt, [class*="rating"]')
-                    if rating_elem:
-                        rating_text = await rating_elem.inner_text()
-                        product_data['rating'] = self.parse_rating(rating_text)
-                    else:
-                        product_data['rating'] = 0.0
-                    
-                    # Extract reviews count
-                    reviews_elem = await container.query_selector('a[href*="#customerReviews"], [aria-label*="ratings"], [class*="review"]')
-                    if reviews_elem:
-                        reviews_text = await reviews_elem.inner_text()
-                        product_data['reviews'] = self.parse_number(reviews_text)
-                    else:
-                        product_data['reviews'] = 0
-                    
-                    # Amazon doesn't show orders, use reviews as proxy
-                    product_data['orders'] = product_data['reviews']  # Use reviews as proxy for demand
-                    
-                    # Get product URL
-                    link_elem = await container.query_selector('h2 a, [data-cy="title-recipe"] a')
-                    if link_elem:
-                        href = await link_elem.get_attribute('href')
-                        if href:
-                            if href.startswith('/'):
-                                product_data['url'] = f"https://www.amazon.com{href.split('?')[0]}"
-                            else:
-                                product_data['url'] = href.split('?')[0]
-                        else:
-                            product_data['url'] = "N/A"
-                    else:
-                        product_data['url'] = "N/A"
-                    
-                    product_data['source'] = 'Amazon'
-                    product_data['keyword'] = keyword
-                    
-                    # Calculate opportunity score
-                    # For Amazon, use reviews as both orders and reviews
-                    product_data['opportunity_score'] = self.calculate_opportunity_score(
-                        product_data['orders'],
-                        product_data['reviews'],
-                        product_data['rating']
-                    )
-                    
-                    if product_data['title'] and product_data['title'] != "N/A":
+                    product_data = self.amazon_product(container, keyword)
+                    if product_data:
                         products.append(product_data)
-                        print(f"  ✓ Found: {product_data['title'][:50]}... | Reviews: {product_data['reviews']} | Score: {product_data['opportunity_score']:.1f}")
+                        print(f"  ✓ Found: {product_data['title'][:50]}... | Reviews: {product_data['reviews']}")
                 
                 except Exception as e:
                     print(f"  ✗ Error extracting product: {e}")
                     continue
             
-            # Rate limiting
-            await page.wait_for_timeout(2000)
-            
         except Exception as e:
             print(f"Error scraping Amazon for {keyword}: {e}")
         
         return products
     
-    async def scrape_all(self, max_products_per_keyword: int = 15):
-        """Scrape all keywords from both sources."""
+    async def scrape_all(self, max_products_per_keyword: int = 15, session: Optional[ScraperSession] = None):
+        """
+        Scrape all keywords from both sources.
+        Pass a running ScraperSession to reuse its browser; otherwise one is
+        started only if some task needs a browser.
+        """
         print("=" * 70)
         print("BEAUTY & SKINCARE PRODUCT SCRAPER")
         print("=" * 70)
         print(f"\nScraping {len(self.keywords)} keywords...")
         print(f"Max products per keyword: {max_products_per_keyword}\n")
         
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            page = await context.new_page()
-            
-            all_products = []
-            
-            for keyword in self.keywords:
-                print(f"\n{'='*70}")
-                print(f"Processing keyword: {keyword}")
-                print(f"{'='*70}")
-                
-                # Scrape AliExpress
-                aliexpress_products = await self.scrape_aliexpress(page, keyword, max_products_per_keyword)
-                all_products.extend(aliexpress_products)
-                
-                # Wait between sources
-                await page.wait_for_timeout(3000)
+        scrapers = (('AliExpress', self.scrape_aliexpress), ('Amazon', self.scrape_amazon_bestsellers))
+        tasks = [(source, scrape, keyword) for keyword in self.keywords for source, scrape in scrapers]
+        
+        # Resume: keywords finished by an earlier, interrupted run are not scraped again
+        done = self.load_checkpoint()
+        results = {(source, keyword): products
+                   for keyword, by_source in done.items() if keyword in self.keywords
+                   for source, products in by_source.items()}
+        if results:
+            print(f"Resuming from {CHECKPOINT_FILE}: {len(results) // len(scrapers)} keyword(s) already done\n")
+        
+        def record(source: str, keyword: str, products: List[Dict]):
+            """Store a finished task; checkpoint the keyword once all its sources are in."""
+            results[(source, keyword)] = products
+            by_source = {src: results.get((src, keyword)) for src, _ in scrapers}
+            # Nothing found usually means a failed scrape, so a keyword is only done
+            # once every source returned products; otherwise the next run retries it
+            if all(by_source.values()):
+                done[keyword] = by_source
+                self.save_checkpoint(done)
+        
+        # Cheap pass first: listing pages that render server-side need no browser
+        if HTTP_SCRAPING_AVAILABLE:
+            todo = [(source, keyword) for source, _, keyword in tasks if (source, keyword) not in results]
+            for (source, keyword), products in (await self.scrape_all_http(todo, max_products_per_keyword)).items():
+                record(source, keyword, products)
+        
+        pending = [task for task in tasks if (task[0], task[2]) not in results]
+        if pending:
+            async with contextlib.AsyncExitStack() as stack:
+                # One browser for the whole run; worker contexts are shared by all
+                # (keyword, site) tasks, so AliExpress and Amazon scrapes overlap
+                if session is None:
+                    session = await stack.enter_async_context(
+                        ScraperSession(max_contexts=min(MAX_CONCURRENT_PAGES, len(pending)), user_agent=USER_AGENT))
                 
-                # Scrape Amazon
-                amazon_products = await self.scrape_amazon_bestsellers(page, keyword, max_products_per_keyword)
-                all_products.extend(amazon_products)
+                async def scrape_in_session(source: str, scrape, keyword: str):
+                    async with session.acquire_page() as page:
+                        record(source, keyword, await scrape(page, keyword, max_products_per_keyword))
                 
-                # Wait between keywords
-                await page.wait_for_timeout(3000)
-            
-            await browser.close()
+                await asyncio.gather(*(
+                    scrape_in_session(source, scrape, keyword) for source, scrape, keyword in pending
+                ))
+        
+        # Reassemble in task order, so dedup keeps the same winners
+        all_products = [product for source, _, keyword in tasks for product in results[(source, keyword)]]
         
+        # CPU-bound; run in a worker thread so the event loop stays free
+        unique_products = await asyncio.to_thread(self._post_process, all_products)
+        
+        self.products = unique_products
+        
+        # Completed run: the next one starts fresh
+        if os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
+        return unique_products
+    
+    def _post_process(self, products: List[Dict]) -> List[Dict]:
+        """Dedupe, score and sort scraped products, best opportunity first."""
         # Remove duplicates based on title similarity
-        unique_products = self.deduplicate_products(all_products)
+        unique_products = self.deduplicate_products(products)
+        
+        # Scored once here in bulk, not per card while scraping
+        self.score_products(unique_products)
         
         # Sort by opportunity score
         unique_products.sort(key=lambda x: x['opportunity_score'], reverse=True)
-        
-        self.products = unique_products
         return unique_products
     
     def deduplicate_products(self, products: List[Dict]) -> List[Dict]:
         """Remove duplicate products based on title similarity."""
         unique = []
-        seen_titles = []
+        # Inverted index: word -> indices (into unique) of kept titles containing it,
+        # so a title is only compared against titles it shares a word with
+        word_to_seen: Dict[str, List[int]] = defaultdict(list)
         
         for product in products:
             # Normalize title for comparison
             title_lower = product['title'].lower().strip()
             title_words = set(title_lower.split()[:5])  # First 5 words as key
             
-            # Check if similar product already exists
-            is_duplicate = False
-            for seen in seen_titles:
-                if len(title_words.intersection(seen)) >= 3:  # 3+ common words = duplicate
-                    is_duplicate = True
-                    break
+            # Count shared words per kept title; 3+ common words = duplicate
+            shared = Counter()
+            for word in title_words:
+                shared.update(word_to_seen.get(word, ()))
+            is_duplicate = any(count >= 3 for count in shared.values())
             
             if not is_duplicate:
+                for word in title_words:
+                    word_to_seen[word].append(len(unique))
                 unique.append(product)
-                seen_titles.append(title_words)
         
         return unique
     
@@ -466,24 +655,24 @@ class ProductScraper:
             print("No products to save!")
             return
         
-        fieldnames = ['title', 'price', 'orders', 'reviews', 'rating', 'opportunity_score', 'source', 'keyword', 'url']
-        
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for product in self.products:
-                writer.writerow({
-                    'title': product.get('title', 'N/A'),
-                    'price': product.get('price', 'N/A'),
-                    'orders': product.get('orders', 0),
-                    'reviews': product.get('reviews', 0),
-                    'rating': product.get('rating', 0.0),
-                    'opportunity_score': round(product.get('opportunity_score', 0.0), 2),
-                    'source': product.get('source', 'N/A'),
-                    'keyword': product.get('keyword', 'N/A'),
-                    'url': product.get('url', 'N/A')
-                })
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_COLUMNS)
+            # Rows as tuples in CSV_COLUMNS order; no per-row dict for DictWriter to reorder
+            writer.writerows(
+                (
+                    product.get('title', 'N/A'),
+                    product.get('price', 'N/A'),
+                    product.get('orders', 0),
+                    product.get('reviews', 0),
+                    product.get('rating', 0.0),
+                    round(product.get('opportunity_score', 0.0), 2),
+                    product.get('source', 'N/A'),
+                    product.get('keyword', 'N/A'),
+                    product.get('url', 'N/A'),
+                )
+                for product in self.products
+            )
         
         print(f"\n{'='*70}")
         print(f"✓ Saved {len(self.products)} products to {filename}")
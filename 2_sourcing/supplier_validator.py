@@ -9,11 +9,14 @@ import re
 import asyncio
 import random
 import os
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from playwright.async_api import async_playwright, Page, Browser
 from urllib.parse import urlparse, parse_qs
 import time
+from functools import lru_cache
+from browser_pool import ScraperSession
 
 # Import rate limiting config
 try:
@@ -36,6 +39,171 @@ except ImportError:
             return 5 * (2 ** attempt)
 
 
+# Date patterns, each paired with the strptime formats its match can be in
+_DATE_PATTERNS = (
+    (re.compile(r'(\d{4})[-\/](\d{1,2})[-\/](\d{1,2})'), ('%Y-%m-%d',)),  # YYYY-MM-DD
+    (re.compile(r'(\d{1,2})[-\/](\d{1,2})[-\/](\d{4})'), ('%m/%d/%Y', '%d/%m/%Y')),  # MM-DD-YYYY
+    (re.compile(r'(\w+)\s+(\d{1,2}),\s+(\d{4})'), ('%B %d, %Y',)),  # Month DD, YYYY
+    (re.compile(r'(\d{4})\s+(\w+)\s+(\d{1,2})'), ('%Y %B %d',)),  # YYYY Month DD
+)
+_YEAR = re.compile(r'(\d{4})')
+# What store pages almost always show: a bare year, optionally labelled
+# ("Since 2017", "Opened: 2019"). None of the full date patterns can match such
+# text, so parse_date answers it without trying them.
+_YEAR_ONLY = re.compile(r'\s*(?:(?:since|opened|open|established|from)\s*:?\s*)?(\d{4})\.?\s*', re.IGNORECASE)
+
+_FEEDBACK_PCT = re.compile(r'(\d+\.?\d*)%')
+_FEEDBACK_NUMBER = re.compile(r'(\d{2,3}\.?\d*)')
+_FEEDBACK_TEXT_PATTERNS = (
+    re.compile(r'(\d+\.?\d*)%\s*positive', re.IGNORECASE),
+    re.compile(r'positive\s*:?\s*(\d+\.?\d*)%', re.IGNORECASE),
+    re.compile(r'feedback\s*:?\s*(\d+\.?\d*)%', re.IGNORECASE),
+)
+_POSITIVE_PCT = re.compile(r'(\d+(\.\d+)?)%\s*[Pp]ositive')
+
+_STORE_YEAR = re.compile(r'(since|opened|established|from)\s*:?\s*(\d{4})', re.IGNORECASE)
+_SINCE_YEAR = re.compile(r'[Ss]ince\s+(\d{4})')
+_OPENED_YEAR = re.compile(r'(opened|established).*?(\d{4})', re.IGNORECASE)
+
+# Carrier names, matched case-insensitively in one pass over the original text
+# (no lowercased copy of a full page body). Not word-bounded, same as the old
+# substring checks: 'express' also counts inside 'aliexpress'.
+_SHIPPING_TOKENS = re.compile(r'aliexpress|standard|e-?packet|dhl|fedex|ups|express', re.I)
+_EXPRESS_CARRIERS = frozenset({'dhl', 'fedex', 'ups'})
+# A range like "15-30 days" matches on its upper bound, which is the one we want
+_SHIPPING_DAYS = re.compile(r'(\d+)\s*days?', re.I)
+
+# Each page is read with one evaluate() returning every field the scraper
+# needs, instead of a query_selector + inner_text round trip per field
+# First look at the product page: click up to three visible close/dismiss
+# controls (cookie banners, coupon pop-ups; they reflow synchronously, so no
+# settle time is needed), then read the store link in the same call
+PRODUCT_STORE_JS = """
+() => {
+    let clicked = 0;
+    for (const el of document.querySelectorAll('button[class*="close"], [class*="close"], [class*="dismiss"]')) {
+        if (clicked >= 3) break;
+        if (el.offsetParent === null) continue;
+        try { el.click(); clicked++; } catch (e) {}
+    }
+    const link = document.querySelector('a[href*="/store/"], [class*="store-name"], [class*="store-link"]');
+    return {
+        storeName: link?.innerText ?? null,
+        storeHref: link?.getAttribute('href') ?? null,
+        altStoreName: document.querySelector('[class*="store"], [data-role="store-name"]')?.innerText ?? null,
+    };
+}
+"""
+
+STORE_PAGE_JS = """
+() => ({
+    dateText: document.querySelector('[class*="open-date"], [class*="store-date"], [class*="since"]')?.innerText ?? null,
+    feedbackText: document.querySelector('[class*="feedback"], [class*="rating"], [class*="positive"]')?.innerText ?? null,
+    bodyText: document.body.innerText,
+})
+"""
+
+# Scroll to the bottom, give lazy-loaded shipping info up to settleMs to show
+# up, then snapshot everything the fallbacks need; one round trip in total
+FALLBACK_PAGE_JS = """
+async ([settleMs]) => {
+    const shippingSelector = '[class*="shipping"], [class*="delivery"], [class*="logistics"]';
+    window.scrollTo(0, document.body.scrollHeight);
+    const deadline = Date.now() + settleMs;
+    while (Date.now() < deadline) {
+        const el = document.querySelector(shippingSelector);
+        if (el && el.offsetParent !== null) break;
+        await new Promise(r => setTimeout(r, 100));
+    }
+    return {
+        storeNames: Array.from(document.querySelectorAll('.store-name, .shop-name, .seller-name, a[href*="/store/"]'), el => el.innerText),
+        shippingText: document.querySelector(shippingSelector)?.innerText ?? null,
+        shippingOptions: Array.from(document.querySelectorAll('[class*="shipping-option"], [data-role="shipping"]'))
+            .slice(0, 3).map(el => el.innerText),
+        bodyText: document.body.innerText,
+    };
+}
+"""
+
+CJ_PAGE_JS = """
+() => ({
+    shippingText: document.querySelector('[class*="shipping"], [class*="delivery"]')?.innerText ?? null,
+    bodyText: document.body.innerText,
+})
+"""
+
+# What each wait below is actually waiting for; the old fixed sleeps are kept
+# as upper bounds, so a fast page moves on as soon as its content is there
+STORE_LINK_SELECTOR = 'a[href*="/store/"], [class*="store-name"], [class*="store-link"]'
+STORE_FIELDS_SELECTOR = '[class*="open-date"], [class*="store-date"], [class*="since"], [class*="feedback"], [class*="rating"], [class*="positive"]'
+STORE_PAGE_SETTLE_MS = 3000
+LAZY_CONTENT_SETTLE_MS = 5000
+
+# Belt and braces with the route blocking: Blink won't even decode images
+IMAGES_OFF_ARGS = ['--blink-settings=imagesEnabled=false']
+
+MAX_CONCURRENT_PAGES = 6  # Products validated in parallel
+# Pages allowed on one supplier site at a time; navigations to a host are
+# also spaced HOST_DELAY_RANGE apart, so load on a site stays jittered
+MAX_PER_DOMAIN = 3
+HOST_DELAY_RANGE = (1.0, 3.0)  # Seconds between navigations to one host
+# Throttle responses, and redirects to a bot check, are retried after
+# RateLimitConfig.get_retry_delay; nothing else waits
+RETRY_STATUS_CODES = (429, 503)
+BOT_CHALLENGE_URL_MARKERS = ('/punish', '_____tmd_____', 'captcha')
+# Fields shared by every product of a store, reused for its later products.
+# Shipping is taken from the first product's page: sellers ship their whole
+# range the same way, and the red flag it feeds is a per-store judgement.
+SHARED_STORE_FIELDS = ('store_open_date', 'feedback_percentage', 'shipping_method')
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Supplier sites, matched on the URL's host (the domain or any subdomain of it)
+# rather than anywhere in the URL, so query strings are never scanned. One
+# alternation classifies a host in a single pass; the group names the site.
+_SUPPLIER_HOST = re.compile(r'(?:^|\.)(?:(?P<aliexpress>aliexpress\.(?:com|us))|(?P<cjdropshipping>cjdropshipping\.com))$')
+
+
+@lru_cache(maxsize=4096)
+def url_host(url: str) -> str:
+    """Lowercased host of `url`; scheme-less URLs like 'aliexpress.com/item/1' work too."""
+    try:
+        host = urlparse(url).hostname
+        if host is None and '//' not in url:
+            host = urlparse('//' + url).hostname
+    except ValueError:  # e.g. an unbalanced '[' in the host
+        return ''
+    return host or ''
+
+
+def store_key(store_url: str) -> str:
+    """Cache key for a store page: scheme, host and path, without query or fragment."""
+    parts = urlparse(store_url)
+    return f"{parts.scheme}://{(parts.hostname or '')}{parts.path.rstrip('/')}"
+
+
+@lru_cache(maxsize=4096)
+def supplier_site(url: str) -> Optional[str]:
+    """'aliexpress' or 'cjdropshipping' for a supplier URL, None for anything else."""
+    match = _SUPPLIER_HOST.search(url_host(url))
+    return match.lastgroup if match else None
+
+
+# Column order of validated_suppliers.csv
+VALIDATED_FIELDS = [
+    'product_title',
+    'product_price',
+    'store_name',
+    'store_url',
+    'store_age_years',
+    'store_open_date',
+    'feedback_percentage',
+    'shipping_method',
+    'shipping_days',
+    'product_url',
+    'product_keyword'
+]
+
+
 class SupplierValidator:
     """Validates suppliers from AliExpress and CJ Dropshipping."""
     
@@ -43,48 +211,82 @@ class SupplierValidator:
         self.validated_suppliers = []
         self.red_flags = []
         self.output_filename = 'validated_suppliers.csv'
+        # Reference instant for store ages and year bounds; a per-run snapshot,
+        # a run is short enough that "now" needn't move while it lasts
+        self._now = datetime.now()
+        # Only text is read, so skip images, media, fonts and CSS
+        self.block_resources = True
+        # Checkpoint CSV, kept open for the whole run (see append_validated_supplier)
+        self._csv_file = None
+        self._writer = None
+        # Store-level fields by store_key(); products of the same store that are
+        # validated at the same time await the first one's result
+        self._store_cache: Dict[str, asyncio.Future] = {}
+        self._host_last_hit: Dict[str, float] = {}
+        self._host_lock: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+    
+    async def __aenter__(self) -> 'SupplierValidator':
+        self._open_csv(self.output_filename)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close_csv()
+    
+    def _open_csv(self, filename: str):
+        """Open `filename` for appending once and keep a DictWriter on it."""
+        if self._csv_file is not None:
+            if self._csv_file.name == filename:
+                return
+            self.close_csv()
+        file_exists = os.path.exists(filename)
+        self._csv_file = open(filename, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=VALIDATED_FIELDS)
+        if not file_exists:
+            self._writer.writeheader()
+    
+    def close_csv(self):
+        """Close the checkpoint CSV if it is open."""
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._writer = None
     
     def is_aliexpress_url(self, url: str) -> bool:
         """Check if URL is from AliExpress."""
-        return 'aliexpress.com' in url.lower() or 'aliexpress.us' in url.lower()
+        return supplier_site(url) == 'aliexpress'
     
     def is_cj_dropshipping_url(self, url: str) -> bool:
         """Check if URL is from CJ Dropshipping."""
-        return 'cjdropshipping.com' in url.lower()
+        return supplier_site(url) == 'cjdropshipping'
     
     def parse_date(self, date_text: str) -> Optional[datetime]:
         """Parse various date formats."""
         if not date_text:
             return None
         
-        # Common date patterns
-        patterns = [
-            r'(\d{4})[-\/](\d{1,2})[-\/](\d{1,2})',  # YYYY-MM-DD
-            r'(\d{1,2})[-\/](\d{1,2})[-\/](\d{4})',  # MM-DD-YYYY
-            r'(\w+)\s+(\d{1,2}),\s+(\d{4})',  # Month DD, YYYY
-            r'(\d{4})\s+(\w+)\s+(\d{1,2})',  # YYYY Month DD
-        ]
+        # Fast path for the common "Since YYYY" / bare-year text
+        year_only = _YEAR_ONLY.fullmatch(date_text)
+        if year_only:
+            year = int(year_only.group(1))
+            return datetime(year, 1, 1) if 2000 <= year <= self._now.year else None
         
-        for pattern in patterns:
-            match = re.search(pattern, date_text)
+        # Common date patterns; only the formats a pattern can match are tried
+        for pattern, formats in _DATE_PATTERNS:
+            match = pattern.search(date_text)
             if match:
-                try:
-                    # Try to parse
-                    date_str = match.group(0)
-                    for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%B %d, %Y', '%Y %B %d']:
-                        try:
-                            return datetime.strptime(date_str, fmt)
-                        except:
-                            continue
-                except:
-                    continue
+                date_str = match.group(0)
+                for fmt in formats:
+                    try:
+                        return datetime.strptime(date_str, fmt)
+                    except ValueError:
+                        continue
         
         # Try to extract year and calculate approximate date
-        year_match = re.search(r'(\d{4})', date_text)
+        year_match = _YEAR.search(date_text)
         if year_match:
             try:
                 year = int(year_match.group(1))
-                if 2000 <= year <= datetime.now().year:
+                if 2000 <= year <= self._now.year:
                     return datetime(year, 1, 1)
             except:
                 pass
@@ -96,7 +298,7 @@ class SupplierValidator:
         if not open_date:
             return None
         
-        age_delta = datetime.now() - open_date
+        age_delta = self._now - open_date
         return age_delta.days / 365.25
     
     def parse_feedback_percentage(self, feedback_text: str) -> Optional[float]:
@@ -105,7 +307,7 @@ class SupplierValidator:
             return None
         
         # Look for percentage patterns
-        match = re.search(r'(\d+\.?\d*)%', feedback_text)
+        match = _FEEDBACK_PCT.search(feedback_text)
         if match:
             try:
                 return float(match.group(1))
@@ -113,7 +315,7 @@ class SupplierValidator:
                 pass
         
         # Look for fraction patterns like "95.5" or "98.2"
-        match = re.search(r'(\d{2,3}\.?\d*)', feedback_text)
+        match = _FEEDBACK_NUMBER.search(feedback_text)
         if match:
             try:
                 value = float(match.group(1))
@@ -129,40 +331,98 @@ class SupplierValidator:
         if not shipping_text:
             return None
         
-        shipping_text = shipping_text.lower()
+        seen = set()
+        for match in _SHIPPING_TOKENS.finditer(shipping_text):
+            token = match.group().lower()
+            seen.add(token)
+            # "AliExpress Standard Shipping" outranks everything else, stop early
+            if 'standard' in seen and 'aliexpress' in seen:
+                # AliExpress Standard is typically 15-30 days
+                return 30
         
-        # Check for "AliExpress Standard Shipping" or fast shipping
-        if 'standard' in shipping_text and 'aliexpress' in shipping_text:
-            # AliExpress Standard is typically 15-30 days
-            return 30
-        elif 'epacket' in shipping_text or 'e-packet' in shipping_text:
+        if 'epacket' in seen or 'e-packet' in seen:
             return 15
-        elif 'dhl' in shipping_text or 'fedex' in shipping_text or 'ups' in shipping_text:
+        elif seen & _EXPRESS_CARRIERS:
             return 7
-        elif 'express' in shipping_text:
+        elif 'express' in seen or 'aliexpress' in seen:
             return 10
         
         # Extract number of days
-        day_patterns = [
-            r'(\d+)\s*days?',
-            r'(\d+)\s*-\s*(\d+)\s*days?',  # Range like "15-30 days"
-            r'(\d+)\s*day',
-        ]
-        
-        for pattern in day_patterns:
-            match = re.search(pattern, shipping_text)
-            if match:
-                try:
-                    if len(match.groups()) == 2:  # Range
-                        return int(match.group(2))  # Take the higher number
-                    else:
-                        return int(match.group(1))
-                except:
-                    continue
+        match = _SHIPPING_DAYS.search(shipping_text)
+        if match:
+            return int(match.group(1))
         
         # Default to 30 if we can't determine
         return 30
     
+    async def wait_for_host(self, url: str):
+        """Space out navigations per host by a random delay instead of sleeping before every one."""
+        host = url_host(url)
+        async with self._host_lock[host]:
+            last_hit = self._host_last_hit.get(host)
+            if last_hit is not None:
+                delay = random.uniform(*HOST_DELAY_RANGE) - (time.monotonic() - last_hit)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._host_last_hit[host] = time.monotonic()
+    
+    async def goto(self, page: Page, url: str, **kwargs):
+        """Navigate politely, backing off only while the site throttles us or shows a bot check."""
+        for attempt in range(RateLimitConfig.MAX_RETRIES + 1):
+            await self.wait_for_host(url)
+            response = await page.goto(url, timeout=60000, **kwargs)
+            throttled = response is not None and response.status in RETRY_STATUS_CODES
+            challenged = any(marker in page.url for marker in BOT_CHALLENGE_URL_MARKERS)
+            if not (throttled or challenged) or attempt == RateLimitConfig.MAX_RETRIES:
+                return response
+            delay = RateLimitConfig.get_retry_delay(attempt)
+            reason = response.status if throttled else 'a bot check'
+            print(f"    ⚠ {url_host(url)} returned {reason}, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+    
+    async def wait_for_content(self, page: Page, selector: str, timeout_ms: int):
+        """Wait until `selector` is visible, at most `timeout_ms`; a page without it just moves on."""
+        try:
+            await page.wait_for_selector(selector, timeout=timeout_ms)
+        except Exception:
+            pass
+    
+    async def scrape_store_page(self, page: Page, store_url: str) -> Dict:
+        """Scrape the store-level fields (open date, feedback) from an AliExpress store page."""
+        store_page_info = {'store_open_date': None, 'feedback_percentage': None}
+        
+        await self.goto(page, store_url, wait_until="networkidle")
+        await self.wait_for_content(page, STORE_FIELDS_SELECTOR, STORE_PAGE_SETTLE_MS)
+        
+        # Scrape store information
+        store_data = await page.evaluate(STORE_PAGE_JS)
+        store_text = store_data['bodyText']
+        
+        # Store open date
+        if store_data['dateText'] is not None:
+            store_page_info['store_open_date'] = self.parse_date(store_data['dateText'])
+        
+        # Try alternative date selectors
+        if not store_page_info['store_open_date']:
+            date_match = _STORE_YEAR.search(store_text)
+            if date_match:
+                year = int(date_match.group(2))
+                store_page_info['store_open_date'] = datetime(year, 1, 1)
+        
+        # Feedback percentage
+        if store_data['feedbackText'] is not None:
+            store_page_info['feedback_percentage'] = self.parse_feedback_percentage(store_data['feedbackText'])
+        
+        # Try to find feedback in various formats
+        if not store_page_info['feedback_percentage']:
+            for pattern in _FEEDBACK_TEXT_PATTERNS:
+                match = pattern.search(store_text)
+                if match:
+                    store_page_info['feedback_percentage'] = float(match.group(1))
+                    break
+        
+        return store_page_info
+    
     async def scrape_aliexpress_store(self, page: Page, product_url: str) -> Dict:
         """Scrape AliExpress store information."""
         print(f"  Scraping AliExpress store from: {product_url[:80]}...")
@@ -176,32 +436,19 @@ class SupplierValidator:
             'red_flags': []
         }
         
+        shared = None  # Resolved here for other products of the same store
+        store_page_ok = False
+        
         try:
-            # Add random delay before request
-            delay = RateLimitConfig.get_random_delay()
-            await asyncio.sleep(delay)
-            
             # Navigate to product page
-            await page.goto(product_url, timeout=60000)
-            await page.wait_for_timeout(int(RateLimitConfig.PAGE_LOAD_DELAY * 1000))
+            await self.goto(page, product_url)
+            await self.wait_for_content(page, STORE_LINK_SELECTOR, int(RateLimitConfig.PAGE_LOAD_DELAY * 1000))
             
-            # Handle popups
-            try:
-                close_buttons = await page.query_selector_all('button, [class*="close"], [class*="dismiss"]')
-                for btn in close_buttons[:3]:
-                    try:
-                        await btn.click(timeout=2000)
-                        await page.wait_for_timeout(500)
-                    except:
-                        pass
-            except:
-                pass
-            
-            # Find store link/name
-            store_link = await page.query_selector('a[href*="/store/"], [class*="store-name"], [class*="store-link"]')
-            if store_link:
-                store_name = await store_link.inner_text()
-                store_href = await store_link.get_attribute('href')
+            # Dismiss popups and find store link/name, in one evaluate()
+            product_data = await page.evaluate(PRODUCT_STORE_JS)
+            if product_data['storeName'] is not None:
+                store_name = product_data['storeName']
+                store_href = product_data['storeHref']
                 if store_href:
                     if store_href.startswith('/'):
                         store_info['store_url'] = f"https://www.aliexpress.com{store_href}"
@@ -210,126 +457,104 @@ class SupplierValidator:
                 store_info['store_name'] = store_name.strip()
             
             # Try alternative selectors for store name
-            if not store_info['store_name']:
-                store_name_elem = await page.query_selector('[class*="store"], [data-role="store-name"]')
-                if store_name_elem:
-                    store_info['store_name'] = (await store_name_elem.inner_text()).strip()
+            if not store_info['store_name'] and product_data['altStoreName'] is not None:
+                store_info['store_name'] = product_data['altStoreName'].strip()
+            
+            # Sellers with several products in the input are only scraped once:
+            # a later product of the same store (or one validated at the same
+            # time, which waits) reuses the store-level fields and skips the
+            # store page and the product-page fallbacks below
+            store_url = store_info['store_url']
+            if store_url:
+                key = store_key(store_url)
+                cached = self._store_cache.get(key)
+                if cached is None:
+                    shared = asyncio.get_running_loop().create_future()
+                    self._store_cache[key] = shared
+                else:
+                    # shield: a cancelled waiter mustn't cancel the shared result
+                    store_fields = await asyncio.shield(cached)
+                    if store_fields is not None:
+                        print("    (Store already scraped this run, reusing it)")
+                        store_info.update(store_fields)
+                        return store_info
+            
+            # Scroll to bottom to ensure lazy-loaded brand info is present, and take one
+            # snapshot of everything the fallbacks below need; taken before the store
+            # page is visited, so it is always this product's page
+            page_data = await page.evaluate(FALLBACK_PAGE_JS, [LAZY_CONTENT_SETTLE_MS])
+            body_text = page_data['bodyText']
+            
+            # Debug: Check if we are seeing the full page
+            print(f"    (Debug: Page text length: {len(body_text)})")
             
             # Navigate to store page if we found the link
-            if store_info['store_url']:
+            if store_url:
                 try:
-                    await page.goto(store_info['store_url'], wait_until="networkidle", timeout=60000)
-                    await page.wait_for_timeout(3000)
-                    
-                    # Scrape store information
-                    # Store open date
-                    date_elem = await page.query_selector('[class*="open-date"], [class*="store-date"], [class*="since"]')
-                    if date_elem:
-                        date_text = await date_elem.inner_text()
-                        store_info['store_open_date'] = self.parse_date(date_text)
-                    
-                    # Try alternative date selectors
-                    if not store_info['store_open_date']:
-                        all_text = await page.inner_text('body')
-                        date_match = re.search(r'(since|opened|established|from)\s*:?\s*(\d{4})', all_text, re.IGNORECASE)
-                        if date_match:
-                            year = int(date_match.group(2))
-                            store_info['store_open_date'] = datetime(year, 1, 1)
-                    
-                    # Feedback percentage
-                    feedback_elem = await page.query_selector('[class*="feedback"], [class*="rating"], [class*="positive"]')
-                    if feedback_elem:
-                        feedback_text = await feedback_elem.inner_text()
-                        store_info['feedback_percentage'] = self.parse_feedback_percentage(feedback_text)
-                    
-                    # Try to find feedback in various formats
-                    if not store_info['feedback_percentage']:
-                        feedback_patterns = [
-                            r'(\d+\.?\d*)%\s*positive',
-                            r'positive\s*:?\s*(\d+\.?\d*)%',
-                            r'feedback\s*:?\s*(\d+\.?\d*)%',
-                        ]
-                        page_text = await page.inner_text('body')
-                        for pattern in feedback_patterns:
-                            match = re.search(pattern, page_text, re.IGNORECASE)
-                            if match:
-                                store_info['feedback_percentage'] = float(match.group(1))
-                                break
-                
+                    store_info.update(await self.scrape_store_page(page, store_url))
+                    store_page_ok = True
                 except Exception as e:
                     print(f"    ⚠ Could not access store page: {e}")
             
             # --- FALLBACK: If store page access failed or data missing, try scraping from product page directly ---
-            
-            # Scroll to bottom to ensure lazy-loaded brand info is present
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await page.wait_for_timeout(5000)
-            
-            # Debug: Check if we are seeing the full page
-            body_len = await page.evaluate("document.body.innerText.length")
-            print(f"    (Debug: Page text length: {body_len})")
 
             if not store_info['store_name']:
                  # Try finding store name in product page brand section or header
-                 candidates = await page.query_selector_all('.store-name, .shop-name, .seller-name, a[href*="/store/"]')
-                 for c in candidates:
-                     text = await c.inner_text()
+                 for text in page_data['storeNames']:
                      if text and len(text) > 2:
                          store_info['store_name'] = text.strip()
                          break
             
             if not store_info['feedback_percentage']:
                 # Look for feedback patterns in the entire product page text
-                body_text = await page.inner_text('body')
                 # Try simpler pattern first
-                match = re.search(r'(\d+(\.\d+)?)%\s*[Pp]ositive', body_text)
+                match = _POSITIVE_PCT.search(body_text)
                 if match:
                     store_info['feedback_percentage'] = float(match.group(1))
 
             if not store_info['store_open_date']:
                  # Look for "Since YYYY" or "Opened: ..." in product page text (common for Brand stories)
-                 body_text = await page.inner_text('body')
-                 
                  # Pattern: "Since 2017" or "since 2017"
-                 since_match = re.search(r'[Ss]ince\s+(\d{4})', body_text)
+                 since_match = _SINCE_YEAR.search(body_text)
                  if since_match:
                      year = int(since_match.group(1))
                      store_info['store_open_date'] = datetime(year, 1, 1)
                  else:
                      # Pattern 2: "Opened ... 2017"
-                     opened_match = re.search(r'(opened|established).*?(\d{4})', body_text, re.IGNORECASE)
+                     opened_match = _OPENED_YEAR.search(body_text)
                      if opened_match:
                          year = int(opened_match.group(2))
                          store_info['store_open_date'] = datetime(year, 1, 1)
             
             # Get shipping information from product page
-            shipping_elem = await page.query_selector('[class*="shipping"], [class*="delivery"], [class*="logistics"]')
-            if shipping_elem:
-                shipping_text = await shipping_elem.inner_text()
-                store_info['shipping_method'] = shipping_text.strip()
+            if page_data['shippingText'] is not None:
+                store_info['shipping_method'] = page_data['shippingText'].strip()
             else:
                 # Try to find shipping info in page text
-                page_text = await page.inner_text('body')
-                if 'aliexpress standard' in page_text.lower():
+                body_lower = body_text.lower()
+                if 'aliexpress standard' in body_lower:
                     store_info['shipping_method'] = 'AliExpress Standard Shipping'
-                elif 'epacket' in page_text.lower():
+                elif 'epacket' in body_lower:
                     store_info['shipping_method'] = 'ePacket'
             
             # If we couldn't get shipping from product page, check shipping options
             if not store_info['shipping_method']:
-                shipping_options = await page.query_selector_all('[class*="shipping-option"], [data-role="shipping"]')
-                for option in shipping_options[:3]:
-                    try:
-                        text = await option.inner_text()
-                        if 'standard' in text.lower() or 'express' in text.lower():
-                            store_info['shipping_method'] = text.strip()
-                            break
-                    except:
-                        continue
+                for text in page_data['shippingOptions']:
+                    if 'standard' in text.lower() or 'express' in text.lower():
+                        store_info['shipping_method'] = text.strip()
+                        break
             
         except Exception as e:
             print(f"    ✗ Error scraping AliExpress: {e}")
             store_info['red_flags'].append(f"Scraping error: {str(e)}")
+        finally:
+            if shared is not None:
+                if store_page_ok:
+                    shared.set_result({field: store_info[field] for field in SHARED_STORE_FIELDS})
+                else:
+                    # Not cached, so the next product of this store tries again
+                    del self._store_cache[key]
+                    shared.set_result(None)
         
         return store_info
     
@@ -347,22 +572,16 @@ class SupplierValidator:
         }
         
         try:
-            # Add random delay before request
-            delay = RateLimitConfig.get_random_delay()
-            await asyncio.sleep(delay)
-            
-            await page.goto(product_url, wait_until="networkidle", timeout=60000)
-            await page.wait_for_timeout(int(RateLimitConfig.PAGE_LOAD_DELAY * 1000))
+            # networkidle already means the page has settled, no extra sleep
+            await self.goto(page, product_url, wait_until="networkidle")
             
             # CJ Dropshipping typically shows shipping info on product page
-            shipping_elem = await page.query_selector('[class*="shipping"], [class*="delivery"]')
-            if shipping_elem:
-                shipping_text = await shipping_elem.inner_text()
-                store_info['shipping_method'] = shipping_text.strip()
+            page_data = await page.evaluate(CJ_PAGE_JS)
+            if page_data['shippingText'] is not None:
+                store_info['shipping_method'] = page_data['shippingText'].strip()
             
             # Check for specific shipping times
-            page_text = await page.inner_text('body')
-            shipping_days = self.parse_shipping_days(page_text)
+            shipping_days = self.parse_shipping_days(page_data['bodyText'])
             if shipping_days:
                 store_info['shipping_days'] = shipping_days
         
@@ -409,9 +628,10 @@ class SupplierValidator:
         
         store_info = {}
         
-        if self.is_aliexpress_url(url):
+        site = supplier_site(url)
+        if site == 'aliexpress':
             store_info = await self.scrape_aliexpress_store(page, url)
-        elif self.is_cj_dropshipping_url(url):
+        elif site == 'cjdropshipping':
             store_info = await self.scrape_cj_dropshipping_store(page, url)
         else:
             print(f"  ⚠ URL is not AliExpress or CJ Dropshipping: {url}")
@@ -447,71 +667,72 @@ class SupplierValidator:
         
         return store_info
     
-    async def validate_all_products(self, products: List[Dict]):
-        """Validate all products from the CSV."""
+    def launch_args(self) -> Optional[List[str]]:
+        """Chromium flags matching this validator's resource settings."""
+        return IMAGES_OFF_ARGS if self.block_resources else None
+    
+    async def validate_all_products(self, products: List[Dict], browser: Optional[Browser] = None):
+        """
+        Validate all products from the CSV.
+        Pass a warm `browser` (see browser_pool.get_or_create_browser) to skip launching one.
+        """
         print("=" * 70)
         print("SUPPLIER VALIDATOR")
         print("=" * 70)
         print(f"\nValidating {len(products)} products...\n")
         
-        async with async_playwright() as p:
-            # Use the simple, proven launch config from debug_scraper.py
-            browser = await p.chromium.launch(headless=True)
-            # Create a simple page with the specific Mac user agent
-            # We skip complex context options that might be triggering detection
-            page = await browser.new_page(
-                 user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            
-            for i, product in enumerate(products, 1):
-                print(f"\n[{i}/{len(products)}] Validating product...")
-                try:
-                    await self.validate_product(page, product)
-                except Exception as e:
-                    print(f"Error validating product: {e}")
-                
-                # Random delay between products (except for last one)
-                if i < len(products):
-                    await asyncio.sleep(5) # Fixed 5s delay to be safe
+        domain_slots = {
+            'aliexpress': asyncio.Semaphore(MAX_PER_DOMAIN),
+            'cjdropshipping': asyncio.Semaphore(MAX_PER_DOMAIN),
+        }
+        
+        # The simple launch config from debug_scraper.py: the specific Mac user agent
+        # and no other context options, which might trigger detection
+        async with ScraperSession(max_contexts=min(MAX_CONCURRENT_PAGES, len(products)) or 1,
+                                  user_agent=USER_AGENT, block_resources=self.block_resources,
+                                  launch_args=self.launch_args(), browser=browser) as session:
+            async def worker(i: int, product: Dict):
+                url = product.get('url', '')
+                domain = supplier_site(url) or 'aliexpress'
+                async with domain_slots[domain], session.acquire_page() as page:
+                    print(f"\n[{i}/{len(products)}] Validating product...")
+                    try:
+                        await self.validate_product(page, product)
+                    except Exception as e:
+                        print(f"Error validating product: {e}")
             
-            await browser.close()
+            await asyncio.gather(*(worker(i, product) for i, product in enumerate(products, 1)))
     
     def append_validated_supplier(self, supplier: Dict, filename: str = 'validated_suppliers.csv'):
-        """Append a single validated supplier to CSV (checkpoint saving)."""
-        fieldnames = [
-            'product_title',
-            'product_price',
-            'store_name',
-            'store_url',
-            'store_age_years',
-            'store_open_date',
-            'feedback_percentage',
-            'shipping_method',
-            'shipping_days',
-            'product_url',
-            'product_keyword'
-        ]
+        """
+        Append a single validated supplier to CSV (checkpoint saving).
+        The file stays open between rows; use the validator as an async context
+        manager to close it, otherwise it is opened on the first row.
+        """
+        self.write_validated_row(supplier, filename)
+        # Flush so the checkpoint survives a crash mid-run
+        self._csv_file.flush()
 
-        file_exists = os.path.exists(filename)
+    def write_validated_row(self, supplier: Dict, filename: str = 'validated_suppliers.csv'):
+        """Write one supplier row into the (buffered) checkpoint CSV without flushing."""
+        self._open_csv(filename)
 
-        with open(filename, 'a', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-
-            writer.writerow({
-                'product_title': supplier.get('product_title', 'N/A'),
-                'product_price': supplier.get('product_price', 'N/A'),
-                'store_name': supplier.get('store_name', 'N/A'),
-                'store_url': supplier.get('store_url', 'N/A'),
-                'store_age_years': f"{supplier.get('store_age_years', 0):.1f}" if supplier.get('store_age_years') else 'N/A',
-                'store_open_date': supplier.get('store_open_date').strftime('%Y-%m-%d') if supplier.get('store_open_date') else 'N/A',
-                'feedback_percentage': f"{supplier.get('feedback_percentage', 0):.1f}" if supplier.get('feedback_percentage') else 'N/A',
-                'shipping_method': supplier.get('shipping_method', 'N/A'),
-                'shipping_days': supplier.get('shipping_days', 'N/A'),
-                'product_url': supplier.get('product_url', 'N/A'),
-                'product_keyword': supplier.get('product_keyword', 'N/A')
-            })
+        age = supplier.get('store_age_years')
+        open_date = supplier.get('store_open_date')
+        feedback = supplier.get('feedback_percentage')
+        self._writer.writerow({
+            'product_title': supplier.get('product_title', 'N/A'),
+            'product_price': supplier.get('product_price', 'N/A'),
+            'store_name': supplier.get('store_name', 'N/A'),
+            'store_url': supplier.get('store_url', 'N/A'),
+            'store_age_years': f"{age:.1f}" if age else 'N/A',
+            'store_open_date': open_date.strftime('%Y-%m-%d') if open_date else 'N/A',
+            'feedback_percentage': f"{feedback:.1f}" if feedback else 'N/A',
+            'shipping_method': supplier.get('shipping_method', 'N/A'),
+            'shipping_days': supplier.get('shipping_days', 'N/A'),
+            'product_url': supplier.get('product_url', 'N/A'),
+            'product_keyword': supplier.get('product_keyword', 'N/A')
+        })
 
     def save_validated_suppliers(self, filename: str = 'validated_suppliers.csv'):
         """Print summary of validated suppliers (file is updated incrementally)."""
@@ -531,61 +752,72 @@ class SupplierValidator:
                 print()
 
 
-def read_products_from_csv(filename: str = 'potential_winners.csv') -> List[Dict]:
+# Input columns copied into each product dict
+PRODUCT_FIELDS = ('title', 'price', 'url', 'keyword', 'reviews', 'rating')
+
+
+def iter_products(filename: str = 'potential_winners.csv',
+                  url_filter: Optional[Callable[[str], bool]] = None) -> Iterator[Dict]:
+    """
+    Yield products with a usable URL (and passing `url_filter`, if given) from the CSV.
+    Columns are looked up by index once from the header; a dict is only built
+    for rows that are kept.
+    """
+    with open(filename, 'r', encoding='utf-8', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        if 'url' not in header:
+            return
+        url_index = header.index('url')
+        columns = [(field, header.index(field)) for field in PRODUCT_FIELDS if field in header]
+        
+        for row in reader:
+            # Filter out invalid URLs
+            url = row[url_index] if url_index < len(row) else ''
+            if not url or url == 'N/A' or 'javascript:void' in url:
+                continue
+            if url_filter is not None and not url_filter(url):
+                continue
+            product = dict.fromkeys(PRODUCT_FIELDS, '')
+            for field, index in columns:
+                if index < len(row):
+                    product[field] = row[index]
+            yield product
+
+
+def read_products_from_csv(filename: str = 'potential_winners.csv',
+                           url_filter: Optional[Callable[[str], bool]] = None) -> List[Dict]:
     """Read products from CSV file."""
-    products = []
-    
     try:
-        with open(filename, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Filter out invalid URLs
-                url = row.get('url', '')
-                if url and url != 'N/A' and 'javascript:void' not in url:
-                    products.append({
-                        'title': row.get('title', ''),
-                        'price': row.get('price', ''),
-                        'url': url,
-                        'keyword': row.get('keyword', ''),
-                        'reviews': row.get('reviews', ''),
-                        'rating': row.get('rating', '')
-                    })
+        return list(iter_products(filename, url_filter))
     except FileNotFoundError:
         print(f"Error: {filename} not found!")
         return []
     except Exception as e:
         print(f"Error reading CSV: {e}")
         return []
-    
-    return products
 
 
 async def main():
     """Main function."""
-    # Read products from CSV
-    products = read_products_from_csv('potential_winners.csv')
-    
-    if not products:
-        print("No products found in potential_winners.csv")
-        return
-    
-    # Filter to only AliExpress and CJ Dropshipping URLs
+    # Read only AliExpress and CJ Dropshipping products from the CSV
     validator = SupplierValidator()
-    filtered_products = []
+    products = read_products_from_csv(
+        'potential_winners.csv',
+        url_filter=supplier_site,
+    )
     
-    for product in products:
-        url = product.get('url', '')
-        if validator.is_aliexpress_url(url) or validator.is_cj_dropshipping_url(url):
-            filtered_products.append(product)
-    
-    if not filtered_products:
-        print("No AliExpress or CJ Dropshipping URLs found in the CSV")
+    if not products:
+        print("No AliExpress or CJ Dropshipping URLs found in potential_winners.csv")
         return
     
-    print(f"Found {len(filtered_products)} products with AliExpress/CJ Dropshipping URLs")
+    print(f"Found {len(products)} products with AliExpress/CJ Dropshipping URLs")
     
     # Validate all products
-    await validator.validate_all_products(filtered_products)
+    async with validator:
+        await validator.validate_all_products(products)
     
     # Save validated suppliers
     validator.save_validated_suppliers('validated_suppliers.csv')
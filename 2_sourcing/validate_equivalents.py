@@ -2,6 +2,7 @@
 import asyncio
 import csv
 import os
+from browser_pool import drain_browser_pool, get_or_create_browser
 from supplier_validator import SupplierValidator
 
 async def main():
@@ -33,11 +34,21 @@ async def main():
     # Initialize validator
     validator = SupplierValidator()
     
-    # Run validation
-    await validator.validate_all_products(products)
+    # Run validation on the shared warm browser; it stays up for the next job in
+    # this process and is only torn down by the entry point (see run)
+    browser = await get_or_create_browser(launch_args=validator.launch_args())
+    async with validator:
+        await validator.validate_all_products(products, browser=browser)
     
     # Save results
     validator.save_validated_suppliers('validated_suppliers.csv')
 
+async def run():
+    """Standalone entry point: one job, then shut the shared browser down."""
+    try:
+        await main()
+    finally:
+        await drain_browser_pool()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
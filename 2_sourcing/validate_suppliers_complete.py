@@ -7,16 +7,30 @@ Complete Supplier Validation Workflow
 4. Outputs validated_suppliers.csv with only approved suppliers
 """
 
+import atexit
 import csv
 import asyncio
+import json
 import re
 import random
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
-from playwright.async_api import async_playwright, Page
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from playwright.async_api import Page
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import sys
 
+# Columnar CSV ingest; falls back to csv.DictReader if pyarrow isn't installed
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
 # Import rate limiting config
 from rate_limit_config import RateLimitConfig
 
@@ -24,11 +38,88 @@ from rate_limit_config import RateLimitConfig
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from supplier_validator import SupplierValidator
+    from browser_pool import (ANTI_BOT_MARKERS, BLOCKED_STATUS_CODES, AsyncRateLimiter, ScraperSession,
+                              aliexpress_search_url, close_popups_once)
+    from supplier_validator import HOST_DELAY_RANGE, SupplierValidator, supplier_site
 except ImportError:
     print("Error: Could not import SupplierValidator. Make sure supplier_validator.py is in the same directory.")
     sys.exit(1)
 
+# Plain-HTTP search lookup, tried before the browser; skipped if the HTTP
+# stack isn't installed
+try:
+    import httpx
+    from selectolax.lexbor import LexborHTMLParser
+    HTTP_LOOKUP_AVAILABLE = True
+except ImportError:
+    HTTP_LOOKUP_AVAILABLE = False
+
+
+def normalize_item_href(href: Optional[str]) -> Optional[str]:
+    """Absolute, query-less AliExpress product URL for a search-result href (None if unusable)."""
+    if not href:
+        return None
+    href = href.split("?")[0]
+
+    # Normalize different href formats
+    if href.startswith("//"):
+        # Protocol-relative URL
+        return f"https:{href}"
+    elif href.startswith("/"):
+        return f"https://www.aliexpress.com{href}"
+    elif href.startswith("http"):
+        return href
+    return None
+
+
+# Products processed concurrently, each worker on its own browser context.
+# Products that already have a supplier URL skip the AliExpress search, so
+# they get more workers; searches are additionally paced by the rate limiter.
+DIRECT_WORKERS = 4
+SEARCH_WORKERS = 2
+# AliExpress searches shared by all workers: at most this many per window,
+# where a search's slot only frees up SEARCH_WINDOW_S after it finished
+SEARCHES_PER_WINDOW = 2
+SEARCH_WINDOW_S = 5.0
+RESULTS_TIMEOUT = 15000  # ms to wait for search results after DOMContentLoaded
+# Plain-HTTP searches that may come back without a usable link in a row before
+# the run stops trying them (a bot wall turns them off at once), so a site that
+# renders results client-side isn't hit twice per lookup
+HTTP_LOOKUP_MAX_MISSES = 3
+# Raw href attributes of the first `limit` product links on a search page
+ITEM_HREFS_JS = """
+(limit) => Array.from(document.querySelectorAll('a[href*="/item/"]'), a => a.getAttribute('href')).slice(0, limit)
+"""
+# Backoff between search retries, seconds
+MIN_BACKOFF_S = 2.0
+MAX_BACKOFF_S = 60.0
+# Browser errors that no retry will fix
+NON_RETRIABLE_ERRORS = ('Target page, context or browser has been closed', 'Browser has been closed')
+
+# Search query -> AliExpress URL found for it, kept across runs; written out
+# every EQUIVALENT_CACHE_FLUSH_EVERY new entries and at the end of a run
+EQUIVALENT_CACHE_FILE = 'aliexpress_equivalent_cache.json'
+EQUIVALENT_CACHE_FLUSH_EVERY = 10
+# Cached queries whose token sets overlap at least this much (Jaccard) count as
+# the same search; titles only differing in word order or case reuse the URL
+SIMILAR_QUERY_THRESHOLD = 0.85
+
+# Words dropped when building a search query from a product title
+TITLE_STOPWORDS = frozenset({'for', 'the', 'and', 'with', 'face'})
+
+# Input columns copied into each product, in product dict order
+PRODUCT_FIELDS = ('title', 'url', 'price', 'keyword', 'reviews', 'rating')
+
+# Column order of aliexpress_equivalents.csv
+EQUIVALENT_FIELDS = [
+    "original_title",
+    "original_url",
+    "original_price",
+    "keyword",
+    "aliexpress_url",
+    "source",
+]
+
 
 class CompleteValidator(SupplierValidator):
     """Extended validator that can find AliExpress equivalents first and log them."""
@@ -36,104 +127,314 @@ class CompleteValidator(SupplierValidator):
     def __init__(self):
         super().__init__()
         self.equivalents_csv = "aliexpress_equivalents.csv"
+        self._eq_file = None
+        self._eq_writer = None
+        # While a run is in progress, CSV rows go through this queue to one writer task
+        self.write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.rate_limiter = AsyncRateLimiter(SEARCHES_PER_WINDOW, SEARCH_WINDOW_S)
+        self._http_client = None  # Opened on the first plain-HTTP lookup
+        self._http_lookup_enabled = HTTP_LOOKUP_AVAILABLE
+        self._http_misses = 0  # Consecutive plain-HTTP lookups without a link
+        self.equivalent_cache: Dict[str, str] = self.load_equivalent_cache()
+        self._unsaved_equivalents = 0
+        # Token -> cached queries containing it, so a near-duplicate lookup only
+        # compares against queries sharing a word (as in deduplicate_products)
+        self._queries_by_token: Dict[str, Set[str]] = defaultdict(set)
+        for query in self.equivalent_cache:
+            self._index_query(query)
+        # Input URLs whose supplier an earlier run already validated
+        self.done: Set[str] = self.load_done_urls()
+
+    def load_done_urls(self) -> Set[str]:
+        """
+        Input URLs already validated by an earlier (possibly interrupted) run.
+        validated_suppliers.csv is appended to row by row, so it doubles as the
+        checkpoint: its product_url is the supplier URL, which covers direct
+        products; Amazon products are matched through aliexpress_equivalents.csv.
+        """
+        done = set()
+        try:
+            with open(self.output_filename, 'r', encoding='utf-8') as f:
+                done.update(row.get('product_url', '') for row in csv.DictReader(f))
+        except OSError:
+            return done
+        try:
+            with open(self.equivalents_csv, 'r', encoding='utf-8') as f:
+                done.update(row['original_url'] for row in csv.DictReader(f)
+                            if row.get('aliexpress_url') in done and row.get('original_url'))
+        except OSError:
+            pass
+        done.discard('')
+        done.discard('N/A')
+        return done
+
+    def _index_query(self, query: str):
+        for token in query.split():
+            self._queries_by_token[token].add(query)
+
+    def find_similar_equivalent(self, query: str) -> Optional[str]:
+        """Cached URL of the most similar earlier query, if it is similar enough."""
+        tokens = set(query.split())
+        if not tokens:
+            return None
+        candidates = set()
+        for token in tokens:
+            candidates |= self._queries_by_token.get(token, set())
+        best_score, best_query = 0.0, None
+        for candidate in candidates:
+            candidate_tokens = set(candidate.split())
+            score = len(tokens & candidate_tokens) / len(tokens | candidate_tokens)
+            if score > best_score:
+                best_score, best_query = score, candidate
+        if best_score >= SIMILAR_QUERY_THRESHOLD:
+            return self.equivalent_cache[best_query]
+        return None
+
+    def load_equivalent_cache(self) -> Dict[str, str]:
+        """Return the {search query: AliExpress URL} map saved by earlier runs."""
+        try:
+            with open(EQUIVALENT_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_equivalent_cache(self):
+        """Persist the equivalent cache (written atomically so a crash can't truncate it)."""
+        tmp_path = f"{EQUIVALENT_CACHE_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.equivalent_cache, f)
+        os.replace(tmp_path, EQUIVALENT_CACHE_FILE)
+        self._unsaved_equivalents = 0
+
+    def remember_equivalent(self, query: str, aliexpress_url: str):
+        """Cache a found equivalent, flushing to disk every few new entries."""
+        self.equivalent_cache[query] = aliexpress_url
+        self._index_query(query)
+        self._unsaved_equivalents += 1
+        if self._unsaved_equivalents >= EQUIVALENT_CACHE_FLUSH_EVERY:
+            self.save_equivalent_cache()
+
+    def _open_equivalents_csv(self):
+        """Open the equivalents CSV once for the run, writing the header if it is new."""
+        if self._eq_file is not None:
+            return
+        file_exists = os.path.exists(self.equivalents_csv)
+        self._eq_file = open(self.equivalents_csv, "a", buffering=1 << 16, newline="", encoding="utf-8")
+        self._eq_writer = csv.DictWriter(self._eq_file, fieldnames=EQUIVALENT_FIELDS)
+        if not file_exists:
+            self._eq_writer.writeheader()
+        # Buffered rows still reach the disk if main never gets to close_csv()
+        atexit.register(self.close_csv)
+
+    def close_csv(self):
+        """Close the validated-suppliers and equivalents CSVs if they are open."""
+        super().close_csv()
+        if self._eq_file is not None:
+            self._eq_file.close()
+            self._eq_file = None
+            self._eq_writer = None
 
     def append_equivalent(self, product: Dict, aliexpress_url: str):
         """Append a found AliExpress equivalent to CSV (for Apify later)."""
-        fieldnames = [
-            "original_title",
-            "original_url",
-            "original_price",
-            "keyword",
-            "aliexpress_url",
-            "source",
-        ]
-        file_exists = os.path.exists(self.equivalents_csv)
-        with open(self.equivalents_csv, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(
-                {
-                    "original_title": product.get("title", ""),
-                    "original_url": product.get("url", ""),
-                    "original_price": product.get("price", ""),
-                    "keyword": product.get("keyword", ""),
-                    "aliexpress_url": aliexpress_url,
-                    "source": "validator",
-                }
-            )
+        row = {
+            "original_title": product.get("title", ""),
+            "original_url": product.get("url", ""),
+            "original_price": product.get("price", ""),
+            "keyword": product.get("keyword", ""),
+            "aliexpress_url": aliexpress_url,
+            "source": "validator",
+        }
+        if self.write_queue is not None:
+            self.write_queue.put_nowait(('equivalent', row))
+        else:
+            self.write_equivalent_row(row)
+
+    def write_equivalent_row(self, row: Dict):
+        """Write one equivalents row into the buffered CSV."""
+        self._open_equivalents_csv()
+        self._eq_writer.writerow(row)
+
+    def append_validated_supplier(self, supplier: Dict, filename: str = 'validated_suppliers.csv'):
+        """Append a validated supplier, via the writer task while one is running."""
+        if self.write_queue is not None:
+            self.write_queue.put_nowait(('validated', supplier, filename))
+        else:
+            super().append_validated_supplier(supplier, filename)
+
+    def start_writer(self):
+        """Route CSV rows through write_queue to a single writer task until stop_writer()."""
+        self.write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def stop_writer(self):
+        """Write out everything still queued and go back to writing rows directly."""
+        if self.write_queue is None:
+            return
+        self.write_queue.put_nowait(None)
+        await self._writer_task
+        self.write_queue = None
+        self._writer_task = None
+
+    async def _writer_loop(self):
+        # Rows that queued up while the last batch was written go out together,
+        # with one flush for the whole batch instead of one per validated row
+        while True:
+            batch = [await self.write_queue.get()]
+            while not self.write_queue.empty():
+                batch.append(self.write_queue.get_nowait())
+            wrote_equivalent = wrote_validated = False
+            for item in batch:
+                if item is None:
+                    continue
+                if item[0] == 'equivalent':
+                    self.write_equivalent_row(item[1])
+                    wrote_equivalent = True
+                else:
+                    self.write_validated_row(item[1], item[2])
+                    wrote_validated = True
+            # Flush so the checkpoint survives a crash mid-run. Equivalents go
+            # first: load_done_urls only sees a validated Amazon product through
+            # its equivalents row, so that row must never be the one lost.
+            if wrote_equivalent:
+                self._eq_file.flush()
+            if wrote_validated:
+                self._csv_file.flush()
+            if None in batch:
+                return
 
     async def find_aliexpress_equivalent(
-        self, page: Page, product_title: str, keyword: str = "", retry_count: int = 0
+        self, page: Page, product_title: str, keyword: str = ""
     ) -> Optional[str]:
         """Find AliExpress equivalent for an Amazon product."""
         # Use keyword if available, otherwise extract from title
         if keyword:
             search_query = keyword
         else:
-            # Extract key terms (remove common words)
-            words = product_title.split()
-            filtered = [w for w in words[:6] if len(w) > 3 and w.lower() not in ['for', 'the', 'and', 'with', 'face']]
+            # Extract key terms (remove common words); only the first 6 words are
+            # looked at, so the rest of a long title is never split
+            words = product_title.split(maxsplit=6)[:6]
+            filtered = [w for w in words if len(w) > 3 and w.lower() not in TITLE_STOPWORDS]
             search_query = ' '.join(filtered[:4])
         
-        try:
-            search_url = f"https://www.aliexpress.com/wholesale?SearchText={search_query.replace(' ', '+')}"
-            
-            # Add random delay before request
-            delay = RateLimitConfig.get_random_delay()
-            await asyncio.sleep(delay)
-            
-            await page.goto(search_url, wait_until="networkidle", timeout=60000)
-            
-            # Random delay after page load
-            await page.wait_for_timeout(int(RateLimitConfig.PAGE_LOAD_DELAY * 1000))
-            
-            # Handle popups
+        # Same query, same search results: reuse what an earlier lookup found
+        cache_key = ' '.join(search_query.lower().split())
+        cached = self.equivalent_cache.get(cache_key)
+        if cached:
+            print("    (Equivalent already found for this search, reusing it)")
+            return cached
+        cached = self.find_similar_equivalent(cache_key)
+        if cached:
+            print("    (Equivalent already found for a near-identical search, reusing it)")
+            return cached
+        
+        # A plain HTTP request is far cheaper than a browser navigation when
+        # AliExpress serves the results server-rendered
+        aliexpress_url = await self.lightweight_find(search_query)
+        if aliexpress_url:
+            self.remember_equivalent(cache_key, aliexpress_url)
+            return aliexpress_url
+        
+        # Retry transient failures in a loop with decorrelated jitter backoff
+        # (each wait random between MIN_BACKOFF_S and 3x the previous one)
+        delay = MIN_BACKOFF_S
+        for attempt in range(RateLimitConfig.MAX_RETRIES + 1):
             try:
-                close_buttons = await page.query_selector_all('button, [class*="close"]')
-                for btn in close_buttons[:2]:
-                    try:
-                        await btn.click(timeout=2000)
-                        await page.wait_for_timeout(500)
-                    except:
-                        pass
-            except:
-                pass
-            
-            # Find first valid product link
-            product_links = await page.query_selector_all('a[href*="/item/"]')
-            
-            for link in product_links[:10]:
-                try:
-                    href = await link.get_attribute("href")
-                    if not href:
-                        continue
-                    href = href.split("?")[0]
-
-                    # Normalize different href formats
-                    if href.startswith("//"):
-                        # Protocol-relative URL
-                        return f"https:{href}"
-                    elif href.startswith("http"):
-                        return href
-                    elif href.startswith("/"):
-                        return f"https://www.aliexpress.com{href}"
-                except:
-                    continue
-            
+                return await self.search_equivalent(page, search_query, cache_key)
+            except PlaywrightError as e:
+                print(f"    Error finding equivalent: {e}")
+                if attempt == RateLimitConfig.MAX_RETRIES or any(m in str(e) for m in NON_RETRIABLE_ERRORS):
+                    return None
+                delay = min(MAX_BACKOFF_S, random.uniform(MIN_BACKOFF_S, delay * 3))
+                print(f"    Retrying in {delay:.1f} seconds... (attempt {attempt + 1}/{RateLimitConfig.MAX_RETRIES})")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                # Not a browser/network failure; retrying would fail the same way
+                print(f"    Error finding equivalent: {e}")
+                return None
+        return None
+    
+    async def lightweight_find(self, search_query: str) -> Optional[str]:
+        """
+        Search AliExpress over plain HTTP and take the first server-rendered /item/ link.
+        Returns None when that isn't possible (bot wall, client-side rendered results,
+        no HTTP stack), so the caller falls back to the browser.
+        """
+        if not self._http_lookup_enabled:
             return None
         
-        except Exception as e:
-            print(f"    Error finding equivalent: {e}")
-            
-            # Retry logic with exponential backoff
-            if retry_count < RateLimitConfig.MAX_RETRIES:
-                retry_delay = RateLimitConfig.get_retry_delay(retry_count)
-                print(f"    Retrying in {retry_delay} seconds... (attempt {retry_count + 1}/{RateLimitConfig.MAX_RETRIES})")
-                await asyncio.sleep(retry_delay)
-                return await self.find_aliexpress_equivalent(page, product_title, keyword, retry_count + 1)
-            
+        try:
+            if self._http_client is None:
+                self._http_client = httpx.AsyncClient(http2=True, headers={'Accept-Language': 'en-US,en;q=0.9'},
+                                                      follow_redirects=True, timeout=30)
+            async with self.rate_limiter:
+                response = await self._http_client.get(
+                    aliexpress_search_url(search_query),
+                    headers={'User-Agent': RateLimitConfig.get_random_user_agent()},
+                )
+        except ImportError as e:
+            # e.g. http2=True without the h2 package installed
+            print(f"    Plain HTTP search unavailable, using the browser only: {e}")
+            self._http_lookup_enabled = False
             return None
+        except httpx.HTTPError as e:
+            print(f"    Plain HTTP search failed: {e}")
+            return self._http_miss()
+        
+        if response.status_code in BLOCKED_STATUS_CODES or any(m in response.text for m in ANTI_BOT_MARKERS):
+            print("    Plain HTTP search hit a bot wall, using the browser for the rest of the run")
+            self._http_lookup_enabled = False
+            return None
+        link = LexborHTMLParser(response.text).css_first('a[href*="/item/"]')
+        href = normalize_item_href(link.attributes.get('href')) if link is not None else None
+        if href is None:
+            return self._http_miss()
+        self._http_misses = 0
+        return href
+
+    def _http_miss(self) -> None:
+        """Count a plain-HTTP lookup that found nothing; stop trying after too many in a row."""
+        self._http_misses += 1
+        if self._http_misses >= HTTP_LOOKUP_MAX_MISSES:
+            print("    Plain HTTP search keeps coming back empty, using the browser for the rest of the run")
+            self._http_lookup_enabled = False
+        return None
+
+    async def close_http(self):
+        """Close the plain-HTTP client if a lookup opened one."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def search_equivalent(self, page: Page, search_query: str, cache_key: str) -> Optional[str]:
+        """One AliExpress search for `search_query`; returns the first product link found."""
+        search_url = aliexpress_search_url(search_query)
+        
+        # Shared limiter instead of a random sleep per worker, which would
+        # let concurrent workers burst the search page together
+        async with self.rate_limiter:
+            # Not networkidle: AliExpress beacons never go quiet, so that
+            # routinely ran into the full timeout
+            await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+        try:
+            await page.wait_for_selector('a[href*="/item/"]', timeout=RESULTS_TIMEOUT)
+        except PlaywrightTimeoutError:
+            return None  # No results rendered for this search
+        
+        # Handle popups (once per context, like the other scrapers)
+        await close_popups_once(page)
+        
+        # Find first valid product link; all candidate hrefs come back in one
+        # evaluate() instead of a get_attribute round trip per link
+        hrefs = await page.evaluate(ITEM_HREFS_JS, 10)
+        
+        for href in hrefs:
+            href = normalize_item_href(href)
+            if href:
+                self.remember_equivalent(cache_key, href)
+                return href
+        
+        return None
     
     async def process_amazon_product(self, page: Page, product: Dict) -> Optional[Dict]:
         """Process an Amazon product: find AliExpress equivalent and validate."""
@@ -168,6 +469,63 @@ class CompleteValidator(SupplierValidator):
         return validated
 
 
+def _is_valid_product(title: str, url: str) -> bool:
+    return bool(title and
+                title != 'Sponsored ' and
+                url and
+                url != 'N/A' and
+                'javascript:void' not in url)
+
+
+def read_products(filename: str) -> List[Dict]:
+    """Read the products worth processing from the input CSV."""
+    if ARROW_AVAILABLE:
+        return _read_products_arrow(filename)
+    
+    products = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            title = row.get('title', '').strip()
+            url = row.get('url', '')
+            
+            # Filter valid products
+            if _is_valid_product(title, url):
+                products.append({
+                    'title': title,
+                    'url': url,
+                    'price': row.get('price', ''),
+                    'keyword': row.get('keyword', ''),
+                    'reviews': row.get('reviews', ''),
+                    'rating': row.get('rating', '')
+                })
+    return products
+
+
+def _read_products_arrow(filename: str) -> List[Dict]:
+    """read_products with the parsing and filtering done by Arrow kernels; same rows out."""
+    # Everything as text, as csv.DictReader would give it; absent columns read as ''
+    convert_options = pa_csv.ConvertOptions(
+        column_types={field: pa.string() for field in PRODUCT_FIELDS},
+        include_columns=list(PRODUCT_FIELDS),
+        include_missing_columns=True,
+        strings_can_be_null=False,
+    )
+    table = pa_csv.read_csv(filename, convert_options=convert_options)
+    columns = {field: pc.fill_null(table[field], '') for field in PRODUCT_FIELDS}
+    columns['title'] = pc.utf8_trim_whitespace(columns['title'])
+    
+    title, url = columns['title'], columns['url']
+    mask = pc.and_(
+        pc.and_(pc.not_equal(title, ''), pc.not_equal(title, 'Sponsored ')),
+        pc.and_(
+            pc.and_(pc.not_equal(url, ''), pc.not_equal(url, 'N/A')),
+            pc.invert(pc.match_substring(url, 'javascript:void')),
+        ),
+    )
+    return pa.table(columns).filter(mask).to_pylist()
+
+
 async def main():
     """Main workflow."""
     print("=" * 70)
@@ -180,28 +538,8 @@ async def main():
     print("4. Save only validated suppliers to validated_suppliers.csv\n")
     
     # Read products from CSV
-    products = []
     try:
-        with open('potential_winners.csv', 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                title = row.get('title', '').strip()
-                url = row.get('url', '')
-                
-                # Filter valid products
-                if (title and 
-                    title != 'Sponsored ' and 
-                    url and 
-                    url != 'N/A' and 
-                    'javascript:void' not in url):
-                    products.append({
-                        'title': title,
-                        'url': url,
-                        'price': row.get('price', ''),
-                        'keyword': row.get('keyword', ''),
-                        'reviews': row.get('reviews', ''),
-                        'rating': row.get('rating', '')
-                    })
+        products = read_products('potential_winners.csv')
     except FileNotFoundError:
         print("Error: potential_winners.csv not found!")
         return
@@ -214,82 +552,115 @@ async def main():
         return
     
     print(f"Found {len(products)} products to process")
-    print(f"Processing all {len(products)} products (with adaptive delays and cooldowns)...\n")
-    
-    # Process all products
-    products_to_process = products
     
     # Initialize validator
     validator = CompleteValidator()
     
-    # Configure rate limiting (balanced by default, then override delays to 5–10s)
-    RateLimitConfig.MIN_DELAY = 5
-    RateLimitConfig.MAX_DELAY = 10
+    # Skip what an interrupted earlier run already validated
+    products_to_process = [p for p in products if p['url'] not in validator.done]
+    if len(products_to_process) < len(products):
+        print(f"Skipping {len(products) - len(products_to_process)} products validated by an earlier run")
+    if not products_to_process:
+        print("All products were already validated!")
+        return
+    print(f"Processing all {len(products_to_process)} products (with shared rate limiting and cooldowns)...\n")
+    
+    # Pacing is shared by all workers rather than a sleep per worker: searches go
+    # through validator.rate_limiter, supplier pages through per-host spacing
     print("\nRate Limiting Configuration:")
-    print(f"  Mode: Balanced (3-8 second delays)")
+    print(f"  AliExpress searches: at most {SEARCHES_PER_WINDOW} per {SEARCH_WINDOW_S:.0f}s, shared by all workers")
+    print(f"  Supplier pages: {HOST_DELAY_RANGE[0]:.0f}-{HOST_DELAY_RANGE[1]:.0f}s apart per host, shared by all workers")
     print(f"  Max Retries: {RateLimitConfig.MAX_RETRIES}")
     print(f"  User Agent Rotation: Enabled")
-    print("\nTo change settings, edit rate_limit_config.py or use:")
-    print("  - RateLimitConfig.configure_for_conservative()  # Safer (5-12s delays)")
-    print("  - RateLimitConfig.configure_for_aggressive()   # Faster (2-4s delays, higher risk)")
+    print("\nTo change settings, edit SEARCHES_PER_WINDOW / SEARCH_WINDOW_S here,")
+    print("HOST_DELAY_RANGE in supplier_validator.py, or retries in rate_limit_config.py")
     print()
     
     # Process products
-    async with async_playwright() as p:
-        # Get random user agent
-        user_agent = RateLimitConfig.get_random_user_agent()
-        
-        # Configure browser context
-        context_options = {
-            'user_agent': user_agent,
-            'viewport': {'width': 1920, 'height': 1080},
-            'locale': 'en-US',
-            'timezone_id': 'America/New_York',
-        }
-        
-        # Add proxy if configured
-        proxy = RateLimitConfig.get_random_proxy()
-        if proxy:
-            context_options['proxy'] = {'server': proxy}
-            print(f"Using proxy: {proxy}")
-        
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(**context_options)
-        page = await context.new_page()
-        
-        for i, product in enumerate(products_to_process, 1):
-            print(f"\nProcessing product {i} of {len(products_to_process)}...")
-            print(f"Title: {product.get('title', '')[:80]}")
-            
-            try:
-                # Check if it's already an AliExpress/CJ URL
-                if validator.is_aliexpress_url(product['url']) or validator.is_cj_dropshipping_url(product['url']):
-                    # Direct validation
-                    await validator.validate_product(page, product)
-                else:
-                    # Find equivalent and validate
-                    await validator.process_amazon_product(page, product)
-            except Exception as e:
-                print(f"  ERROR processing product {i}/{len(products_to_process)}: {e}")
-            
-            # Adaptive delays
-            if i < len(products_to_process):
-                if i % 20 == 0:
+    # Get random user agent
+    user_agent = RateLimitConfig.get_random_user_agent()
+    
+    # Configure browser context
+    context_options = {
+        'user_agent': user_agent,
+        'viewport': {'width': 1920, 'height': 1080},
+        'locale': 'en-US',
+        'timezone_id': 'America/New_York',
+    }
+    
+    # Add proxy if configured
+    proxy = RateLimitConfig.get_random_proxy()
+    if proxy:
+        context_options['proxy'] = {'server': proxy}
+        print(f"Using proxy: {proxy}")
+    
+    # Products with an AliExpress/CJ URL are validated directly; the rest need a
+    # search first. Each kind gets its own queue, drained by its own workers that
+    # borrow pages from one browser's context pool; a slow search only stalls its
+    # own worker, and contexts are swapped for fresh ones after MAX_USES pages
+    direct_queue: asyncio.Queue = asyncio.Queue()
+    search_queue: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(products_to_process, 1):
+        if supplier_site(item[1]['url']):
+            direct_queue.put_nowait(item)
+        else:
+            search_queue.put_nowait(item)
+    total = len(products_to_process)
+    direct_workers = min(DIRECT_WORKERS, direct_queue.qsize())
+    search_workers = min(SEARCH_WORKERS, search_queue.qsize())
+    print(f"{direct_queue.qsize()} products have a supplier URL already, {search_queue.qsize()} need a search")
+    
+    # Only hrefs and text are read, so images, fonts, media, CSS and analytics
+    # beacons are aborted in every pooled context
+    async with ScraperSession(max_contexts=direct_workers + search_workers, context_options=context_options,
+                              block_resources=validator.block_resources) as session:
+        async def worker(queue: asyncio.Queue, process):
+            handled = 0
+            while True:
+                try:
+                    i, product = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                
+                print(f"\nProcessing product {i} of {total}...")
+                print(f"Title: {product.get('title', '')[:80]}")
+                
+                async with session.acquire_page() as page:
+                    try:
+                        await process(page, product)
+                    except Exception as e:
+                        print(f"  ERROR processing product {i}/{total}: {e}")
+                    
+                    handled += 1
+                    # Rotate user agent every 5 products (if not using proxy)
+                    if not proxy and handled % 5 == 0:
+                        new_ua = RateLimitConfig.get_random_user_agent()
+                        await page.context.set_extra_http_headers({'User-Agent': new_ua})
+                        print(f"  Rotated user agent")
+                
+                # No per-product sleep here: navigations are already paced by the
+                # shared limiters, and a timer per worker would stack on top of them
+                if not queue.empty() and handled % 20 == 0:
                     # Cooldown every 20 products
                     print("  Cooldown: sleeping for 60 seconds to mimic human behavior...")
                     await asyncio.sleep(60)
-                else:
-                    delay = RateLimitConfig.get_random_delay()
-                    print(f"  Waiting {delay:.1f} seconds before next product...")
-                    await asyncio.sleep(delay)
-            
-            # Rotate user agent every 5 products (if not using proxy)
-            if not proxy and i % 5 == 0:
-                new_ua = RateLimitConfig.get_random_user_agent()
-                await context.set_extra_http_headers({'User-Agent': new_ua})
-                print(f"  Rotated user agent")
         
-        await browser.close()
+        # Workers only queue their CSV rows; one writer task writes them out
+        validator.start_writer()
+        try:
+            await asyncio.gather(
+                # Direct validation
+                *(worker(direct_queue, validator.validate_product) for _ in range(direct_workers)),
+                # Find equivalent and validate
+                *(worker(search_queue, validator.process_amazon_product) for _ in range(search_workers)),
+            )
+        finally:
+            # Even if a worker blew up: drain the queued rows, then make sure the
+            # buffered CSVs and unsaved cache entries reach the disk
+            await validator.stop_writer()
+            await validator.close_http()
+            validator.close_csv()
+            validator.save_equivalent_cache()
     
     # Save results
     validator.save_validated_suppliers('validated_suppliers.csv')